@@ -1,14 +1,12 @@
 import streamlit as st
-import pandas as pd
 from io import BytesIO
 from datetime import datetime
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from name_generator import generate_startup_names
-from domain_checker import check_domain_availability
-from PIL import Image
+from pipeline import VARIANTS, PipelineJob
+from domain_checker import EXTENSIONS
+from tld_policy import TLD_SETS, TldPolicy, parse_tlds
+from exports import csv_bytes, export_rows, pdf_bytes
+from results import DomainResult
+from metrics import start_metrics_server
 import os
 import base64
 import streamlit.components.v1 as components
@@ -30,6 +28,9 @@ components.html("""
 # Page Setup
 st.set_page_config(page_title="AI Startup Name Generator", layout="centered")
 
+# /metrics endpoint for the whole process when METRICS_PORT is set (no-op after the first run)
+start_metrics_server()
+
 # Dark Mode Toggle
 dark_mode = st.toggle("🌙 Enable Dark Mode", value=False)
 if dark_mode:
@@ -45,31 +46,50 @@ if dark_mode:
     """, unsafe_allow_html=True)
 
 # Logo + Title
-image_path = os.path.join(os.path.dirname(__file__), "assets", "raytiklogo-main.png")
-logo_html = ""
-if os.path.exists(image_path):
-    image = Image.open(image_path)
-    buffer = BytesIO()
-    image.save(buffer, format="PNG")
-    img_str = base64.b64encode(buffer.getvalue()).decode()
-    logo_html = f'<img src="data:image/png;base64,{img_str}" width="100" style="display:block;margin:auto;">'
+@st.cache_resource
+def header_html():
+    # Built once per process: the logo is shrunk to 2x its 100px display size and inlined
+    logo_html = ""
+    image_path = os.path.join(os.path.dirname(__file__), "assets", "raytiklogo-main.png")
+    if os.path.exists(image_path):
+        from PIL import Image
+
+        image = Image.open(image_path)
+        image.thumbnail((200, 200))
+        buffer = BytesIO()
+        image.save(buffer, format="PNG", optimize=True)
+        img_str = base64.b64encode(buffer.getvalue()).decode()
+        logo_html = f'<img src="data:image/png;base64,{img_str}" width="100" style="display:block;margin:auto;">'
 
-st.markdown(f"""
+    return f"""
 <div style='text-align: center;'>
     {logo_html}
     <h2 style='font-size:28px; font-weight:600;'>🤖 Instantly generate AI-powered brand names with domain availability check.</h2>
     <p style='font-size:16px;'>Generate creative company names using AI and instantly check domain availability!</p>
 </div>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(header_html(), unsafe_allow_html=True)
 
 # Session State
-for key in ["button_disabled", "generated_names", "domain_results", "suggested_name", "timestamp"]:
+for key in ["button_disabled", "generated_names", "domain_results", "suggested_name", "timestamp",
+            "generated_keywords", "pdf_ready_for"]:
     if key not in st.session_state:
         st.session_state[key] = False if key == "button_disabled" else [] if "names" in key else ""
+if "job" not in st.session_state:
+    st.session_state.job = None
 
 # Inputs
 keywords = st.text_input("💡 Enter business idea or keywords", placeholder="e.g. beauty, AI, mehndi", key="keywords")
 count = st.slider("📌 How many name suggestions?", 1, 10, 5, key="count")
+require_com = st.checkbox("🎯 Only names with .com available", key="require_com")
+if require_com:
+    st.checkbox("🧬 Also try variations of the AI names (more hits per round)", value=True, key="use_variants")
+with st.expander("🌐 Domain extensions"):
+    st.text_input("Extensions to check, most wanted first", ", ".join(EXTENSIONS), key="tlds",
+                  help=f"Separated by commas or spaces, e.g. .com, .io. Whole sets work too: {', '.join(TLD_SETS)}")
+    st.number_input("Stop checking a name once this many are available (0 = check all)", 0, 50, 0, key="stop_after")
+    st.checkbox("Skip country extensions (.in, .ai, ...) when the .com is free", key="skip_cctlds")
 
 # Button Callback
 def process_generation():
@@ -79,78 +99,84 @@ def process_generation():
         st.session_state.button_disabled = False
         return
 
-    with st.spinner("Generating names using AI..."):
-        names, suggested = generate_startup_names(st.session_state.keywords, st.session_state.count)
-        st.session_state.generated_names = names
-        st.session_state.suggested_name = suggested
-        st.session_state.domain_results = {}
-        st.session_state.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        for name in names:
-            clean_name = name.strip().replace(" ", "").lower()
-            if name in st.session_state.domain_results:
-                continue
-            try:
-                results = check_domain_availability(clean_name)
-                st.session_state.domain_results[name] = results
-            except Exception as e:
-                st.session_state.domain_results[name] = {"Error": str(e)}
+    st.session_state.generated_names = []
+    st.session_state.suggested_name = ""
+    st.session_state.domain_results = {}
+    st.session_state.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    st.session_state.generated_keywords = st.session_state.keywords
+    # Generation and checks run on a background thread; the progress fragment below polls it
+    required = [".com"] if st.session_state.require_com else None
+    ignored = []
+    tlds = parse_tlds(st.session_state.tlds, ignored)
+    if ignored:
+        st.warning(f"Ignored extensions that aren't valid: {', '.join(ignored)}")
+    policy = TldPolicy(tlds or EXTENSIONS, stop_after=st.session_state.stop_after,
+                       skip_cctlds_if_com=st.session_state.skip_cctlds)
+    # NAME_VARIANTS sets how many variations each round adds; 20 when it is unset
+    variants = (VARIANTS or 20) if st.session_state.get("use_variants") else 0
+    st.session_state.job = PipelineJob(st.session_state.keywords, st.session_state.count,
+                                       required_tlds=required, policy=policy, variants=variants).start()
+
+def render_name_rows(names, suggested, domain_results):
+    for name in names:
+        is_suggested = name == suggested
+        label = "<span style='color:#00ffcc; font-weight:bold;'>✨ Suggested Name</span>" if is_suggested else ""
+        st.markdown(f"### 🔹 {name} {label}", unsafe_allow_html=True)
 
+        domains = domain_results.get(name, {})
+        for domain, result in domains.items():
+            label = result.label if result is not None else "⏳ Checking..."
+            st.markdown(f"<div style='overflow-wrap: break-word;'>- 🔗 <strong>{domain}</strong> — {label}</div>", unsafe_allow_html=True)
+        st.markdown("---")
+
+def show_progress():
+    job = st.session_state.job
+    names, suggested, results = job.snapshot()
+    if not job.done:
+        st.info(f"⏳ Generating names and checking domains... {len(names)} of {job.count} names so far")
+        render_name_rows(names, suggested, results)
+        return
+
+    # Anything still pending here was cut short by a failed run
+    results = {
+        name: {domain: result or DomainResult.failed(domain, job.error or "not checked") for domain, result in rows.items()}
+        for name, rows in results.items()
+    }
+    st.session_state.generated_names = names
+    st.session_state.suggested_name = suggested
+    st.session_state.domain_results = results
+    st.session_state.job = None
     st.session_state.button_disabled = False
+    st.rerun()
 
 st.button("🔍 Generate + Check Domain", on_click=process_generation, disabled=st.session_state.button_disabled)
 
+# Live results while a run is in progress (only this fragment reruns on each poll)
+if st.session_state.job is not None:
+    st.fragment(show_progress, run_every=0.5)()
+
 # Output Display
 if st.session_state.generated_names:
     st.success("✅ AI Suggested Names with Domain Status:")
-    csv_data = []
-
-    for name in st.session_state.generated_names:
-        is_suggested = name == st.session_state.suggested_name
-        label = "<span style='color:#00ffcc; font-weight:bold;'>✨ Suggested Name</span>" if is_suggested else ""
-        st.markdown(f"### 🔹 {name} {label}", unsafe_allow_html=True)
+    render_name_rows(st.session_state.generated_names, st.session_state.suggested_name, st.session_state.domain_results)
 
-        domains = st.session_state.domain_results.get(name, {})
-        for domain, status in domains.items():
-            st.markdown(f"<div style='overflow-wrap: break-word;'>- 🔗 <strong>{domain}</strong> — {status}</div>", unsafe_allow_html=True)
-            csv_data.append({"Name": name, "Suggested": "Yes" if is_suggested else "No", "Domain": domain, "Status": status})
-        st.markdown("---")
-
-    # CSV + PDF Downloads
-    df = pd.DataFrame(csv_data)
-    csv = df.to_csv(index=False).encode("utf-8")
-
-    def generate_pdf_table(keywords, data, timestamp):
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4)
-        styles = getSampleStyleSheet()
-        elements = [Paragraph("AI Startup Name Suggestions", styles["Title"]), Spacer(1, 12)]
-        elements.append(Paragraph(f"<para align='center'><b>Keywords:</b> {keywords}<br/><b>Generated On:</b> {timestamp}</para>", styles["Normal"]))
-        elements.append(Spacer(1, 12))
-
-        table_data = [["Name", "Suggested", "Domain", "Status"]] + [[r["Name"], r["Suggested"], r["Domain"], r["Status"]] for r in data]
-        table = Table(table_data, repeatRows=1)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#f0f0f0")),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-        ]))
-        elements.append(table)
-        doc.build(elements)
-        buffer.seek(0)
-        return buffer
-
-    pdf_buffer = generate_pdf_table(st.session_state.keywords, csv_data, st.session_state.timestamp)
+    # CSV + PDF Downloads (memoised on the results, so reruns reuse the same bytes)
+    rows = list(export_rows(st.session_state.generated_names, st.session_state.suggested_name, st.session_state.domain_results))
+    export_keywords = st.session_state.generated_keywords
+    csv = csv_bytes(export_keywords, st.session_state.timestamp, rows)
 
     st.markdown("#### 📂 Download Results")
     col1, col2 = st.columns(2)
     with col1:
         st.download_button("📄 Download CSV", data=csv, file_name="startup_names.csv", mime="text/csv")
     with col2:
-        st.download_button("📑 Download PDF", data=pdf_buffer, file_name="startup_names.pdf", mime="application/pdf")
+        # The PDF is only built once asked for; after that it comes from the export cache
+        if st.session_state.pdf_ready_for == st.session_state.timestamp:
+            pdf = pdf_bytes(export_keywords, st.session_state.timestamp, rows)
+            st.download_button("📑 Download PDF", data=pdf, file_name="startup_names.pdf", mime="application/pdf")
+        elif st.button("📑 Prepare PDF"):
+            st.session_state.pdf_ready_for = st.session_state.timestamp
+            st.rerun()
 
     # Share Buttons
     st.markdown("#### 🙌 Share or Give Feedback")
@@ -0,0 +1,153 @@
+"""Offline latency/throughput benchmark against the local stub servers.
+
+    python -m bench.benchmark                       # all scenarios, default stub settings
+    python -m bench.benchmark --scenario batch --batch-size 50 --latency-ms 120 --rate-limit-rate 0.05
+    python -m bench.benchmark --json > bench_output.json
+    python -m bench.benchmark --scenario batch --tlds global --stop-after 3 --skip-cctlds-if-com
+
+Caches, the known-domain index and the DNS pre-filter are switched off so
+every lookup reaches the stub; provider rate limits are raised to
+``--provider-rate`` unless you pass a lower value to see the limiter at work.
+"""
+
+import argparse
+import json
+import os
+import time
+import uuid
+
+from bench.stub_servers import StubServer, add_config_args, config_from_args
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def summarise(name, latencies, lookups, elapsed):
+    return {
+        "scenario": name,
+        "samples": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "lookups_per_s": round(lookups / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def bench_single(iterations):
+    from domain_checker import EXTENSIONS, check_domain_availability
+
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t = time.perf_counter()
+        check_domain_availability(f"bench{uuid.uuid4().hex[:10]}")
+        latencies.append(time.perf_counter() - t)
+    return summarise("single-name", latencies, iterations * len(EXTENSIONS), time.perf_counter() - started)
+
+
+def bench_batch(iterations, batch_size, policy=None):
+    from domain_checker import check_many
+
+    # Latency here is time from batch start until each individual result arrives
+    latencies = []
+    lookups = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        names = [f"bench{uuid.uuid4().hex[:10]}" for _ in range(batch_size)]
+        t = time.perf_counter()
+        for _, result in check_many(names, policy=policy):
+            latencies.append(time.perf_counter() - t)
+            lookups += result.source != "policy"
+    return summarise(f"batch-{batch_size}", latencies, lookups, time.perf_counter() - started)
+
+
+def bench_pipeline(iterations, count):
+    from pipeline import run_pipeline
+
+    totals, first_results = [], []
+    lookups = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t = time.perf_counter()
+        first = None
+        for event in run_pipeline(f"bench {uuid.uuid4().hex[:8]}", count):
+            if event[0] == "result":
+                lookups += 1
+                first = first or time.perf_counter() - t
+        totals.append(time.perf_counter() - t)
+        first_results.append(first or totals[-1])
+    elapsed = time.perf_counter() - started
+    return [
+        summarise("pipeline-total", totals, lookups, elapsed),
+        summarise("pipeline-first-result", first_results, lookups, elapsed),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lookups and the full pipeline against local stubs.")
+    parser.add_argument("--scenario", choices=["all", "single", "batch", "pipeline"], default="all")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=25)
+    parser.add_argument("--count", type=int, default=5, help="names per pipeline run")
+    parser.add_argument("--provider-rate", type=float, default=1000.0, help="per-provider requests/s budget")
+    parser.add_argument("--tlds", help="batch scenario: TLDs or set names to check, e.g. global")
+    parser.add_argument("--stop-after", type=int, help="batch scenario: stop a name's TLDs once N are available")
+    parser.add_argument("--skip-cctlds-if-com", action="store_true", help="batch scenario: skip ccTLDs when .com is free")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--metrics", action="store_true", help="also print the app's Prometheus metrics")
+    add_config_args(parser)
+    args = parser.parse_args()
+
+    with StubServer(config_from_args(args)) as stub:
+        # Must be set before the app modules are imported: they read settings at import time
+        os.environ.update(stub.env())
+        os.environ.update({
+            "DOMAIN_CACHE_PATH": "off",
+            "NAME_CACHE_PATH": "off",
+            "KNOWN_INDEX_PATH": "off",
+            "DNS_PREFILTER": "off",
+            "OPENROUTER_API_KEY": "bench",
+            "API_NINJAS_KEY": "bench",
+            "WHOSXY_API_KEY": "bench",
+        })
+        for provider in ("API_NINJAS", "WHOXY", "RDAP"):
+            os.environ[f"{provider}_RATE"] = str(args.provider_rate)
+            os.environ[f"{provider}_BURST"] = str(args.provider_rate)
+
+        results = []
+        if args.scenario in ("all", "single"):
+            results.append(bench_single(args.iterations))
+        if args.scenario in ("all", "batch"):
+            policy = None
+            if args.tlds or args.stop_after or args.skip_cctlds_if_com:
+                from domain_checker import EXTENSIONS
+                from tld_policy import TldPolicy, parse_tlds
+                policy = TldPolicy(parse_tlds(args.tlds) if args.tlds else EXTENSIONS,
+                                   stop_after=args.stop_after, skip_cctlds_if_com=args.skip_cctlds_if_com)
+            results.append(bench_batch(max(1, args.iterations // 5), args.batch_size, policy))
+        if args.scenario in ("all", "pipeline"):
+            results.extend(bench_pipeline(max(1, args.iterations // 4), args.count))
+        requests_seen = stub.counts
+
+    if args.json:
+        print(json.dumps({"results": results, "upstream_requests": requests_seen}, indent=2))
+        return
+
+    print(f"{'scenario':<24}{'samples':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'lookups/s':>12}")
+    for row in results:
+        print(f"{row['scenario']:<24}{row['samples']:>8}{row['p50_ms']:>10}{row['p95_ms']:>10}"
+              f"{row['p99_ms']:>10}{row['lookups_per_s']:>12}")
+    print("upstream requests:", ", ".join(f"{k}={v}" for k, v in sorted(requests_seen.items())))
+    if args.metrics:
+        from metrics import export_prometheus
+        print()
+        print(export_prometheus())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Cold-start and rerun timings for the Streamlit app, without a browser.
+
+    python -m bench.startup_bench                  # 5 cold starts, 30 reruns
+    python -m bench.startup_bench --cold 10 --reruns 100 --json
+
+A cold start is a fresh interpreter importing the app and running the script
+once; a rerun is the same script executed again in a warm process, which is
+what every click and keystroke in the UI costs. Caches and the DNS pre-filter
+are off so nothing on disk skews the numbers; no button is pressed, so no
+network calls are made.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from bench.benchmark import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+ENV = {"DOMAIN_CACHE_PATH": "off", "NAME_CACHE_PATH": "off", "KNOWN_INDEX_PATH": "off", "DNS_PREFILTER": "off"}
+
+_COLD_RUN = """
+import time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=60)
+at.run()
+assert not at.exception, at.exception
+print(time.perf_counter() - started)
+"""
+
+
+def cold_start():
+    env = dict(os.environ, **ENV)
+    out = subprocess.run([sys.executable, "-c", _COLD_RUN.format(app=APP)], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def reruns(count):
+    from streamlit.testing.v1 import AppTest
+
+    os.environ.update(ENV)
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.run()
+    samples = []
+    for _ in range(count):
+        t = time.perf_counter()
+        at.run()
+        samples.append(time.perf_counter() - t)
+    if at.exception:
+        raise RuntimeError(at.exception)
+    return samples
+
+
+def summarise(name, samples):
+    return {
+        "scenario": name,
+        "samples": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 1),
+        "p95_ms": round(percentile(samples, 95) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1) if samples else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time app cold starts and warm reruns.")
+    parser.add_argument("--cold", type=int, default=5, help="fresh-process starts to time")
+    parser.add_argument("--reruns", type=int, default=30, help="warm reruns to time")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    if args.cold:
+        results.append(summarise("cold-start", [cold_start() for _ in range(args.cold)]))
+    if args.reruns:
+        results.append(summarise("rerun", reruns(args.reruns)))
+
+    if args.json:
+        print(json.dumps({"results": results}, indent=2))
+        return
+    print(f"{'scenario':<16}{'samples':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for row in results:
+        print(f"{row['scenario']:<16}{row['samples']:>8}{row['p50_ms']:>10}{row['p95_ms']:>10}{row['max_ms']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""Local stand-ins for OpenRouter, API Ninjas, Whoxy and RDAP.
+
+One threaded HTTP server answers all four APIs, so pointing every
+``*_BASE_URL`` setting at it runs the whole app offline:
+
+    python -m bench.stub_servers --port 8999 --latency-ms 80 --error-rate 0.02 --rate-limit-rate 0.05
+
+    OPENROUTER_BASE_URL=http://127.0.0.1:8999/api/v1
+    API_NINJAS_BASE_URL=http://127.0.0.1:8999
+    WHOXY_BASE_URL=http://127.0.0.1:8999
+    RDAP_BASE_URL=http://127.0.0.1:8999
+
+Whether a domain is "registered" is a stable hash of its name, so repeated
+runs see the same answers.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+NO_RDAP_TLDS = (".in",)  # ccTLDs the bootstrap knows no RDAP server for
+
+SYLLABLES = ["glo", "ra", "vi", "zen", "ka", "lu", "mo", "tri", "no", "va", "sy", "qu", "fy", "ly", "ex", "io"]
+
+
+class StubConfig:
+    def __init__(self, latency_ms=50.0, jitter_ms=20.0, error_rate=0.0, rate_limit_rate=0.0,
+                 retry_after=1, registered_ratio=0.6, llm_latency_ms=800.0, llm_token_ms=15.0):
+        self.latency_ms = latency_ms              # mean lookup latency
+        self.jitter_ms = jitter_ms                # +/- uniform jitter on every response
+        self.error_rate = error_rate              # share of requests answered 500
+        self.rate_limit_rate = rate_limit_rate    # share of requests answered 429
+        self.retry_after = retry_after            # Retry-After seconds sent with 429s
+        self.registered_ratio = registered_ratio  # share of domains reported taken
+        self.llm_latency_ms = llm_latency_ms      # time to first token
+        self.llm_token_ms = llm_token_ms          # delay between streamed chunks
+
+
+def is_registered(domain, ratio):
+    digest = hashlib.sha1(domain.lower().encode()).digest()
+    return digest[0] / 255 < ratio
+
+
+def fake_names(prompt, count):
+    rng = random.Random(prompt)
+    return ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize() for _ in range(count)]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+    config = StubConfig()
+    counts = {}
+    _counts_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _count(self, key):
+        with self._counts_lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def _sleep(self, mean_ms):
+        jitter = random.uniform(-self.config.jitter_ms, self.config.jitter_ms)
+        time.sleep(max(0.0, mean_ms + jitter) / 1000)
+
+    def _send(self, status, body=None, headers=None):
+        payload = json.dumps(body if body is not None else {}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _faults(self):
+        # Returns True if this request was answered with an injected 429/500
+        roll = random.random()
+        if roll < self.config.rate_limit_rate:
+            self._count("429")
+            self._send(429, {"error": "rate limited"}, {"Retry-After": str(self.config.retry_after)})
+            return True
+        if roll < self.config.rate_limit_rate + self.config.error_rate:
+            self._count("500")
+            self._send(500, {"error": "injected failure"})
+            return True
+        return False
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        self._sleep(self.config.latency_ms)
+        if self._faults():
+            return
+        ratio = self.config.registered_ratio
+
+        if url.path == "/v1/domainlookup":
+            self._count("api_ninjas")
+            domain = query.get("domain", [""])[0]
+            self._send(200, {"domain": domain, "is_registered": is_registered(domain, ratio)})
+        elif "whois" in query:
+            self._count("whoxy")
+            domain = query["whois"][0]
+            if is_registered(domain, ratio):
+                self._send(200, {"status": 1, "domain_name": domain, "domain": {"name": domain}})
+            else:
+                self._send(200, {"status": 0, "status_reason": "Domain not registered"})
+        elif url.path.startswith("/domain/"):
+            # Like rdap.org: redirect to the registry's server, or a bare 404 for a TLD without one
+            self._count("rdap")
+            domain = url.path[len("/domain/"):]
+            if domain.endswith(NO_RDAP_TLDS):
+                self._send(404, {"error": "no RDAP server known for this TLD"})
+            else:
+                self._send(302, headers={"Location": f"/registry/domain/{domain}"})
+        elif url.path.startswith("/registry/domain/"):
+            domain = url.path[len("/registry/domain/"):]
+            if is_registered(domain, ratio):
+                self._send(200, {"objectClassName": "domain", "ldhName": domain})
+            else:
+                self._send(404, {"errorCode": 404})
+        else:
+            self._send(404, {"error": "unknown endpoint"})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            self._send(404, {"error": "unknown endpoint"})
+            return
+        self._count("openrouter")
+        self._sleep(self.config.llm_latency_ms)
+        if self._faults():
+            return
+
+        prompt = body["messages"][-1]["content"]
+        count = int(prompt.split("Give exactly ", 1)[1].split()[0]) if "Give exactly " in prompt else 5
+        names = fake_names(prompt, count)
+        text = "Sure! Here are some names:\n" + "\n".join(names) + f"\nSuggested: {names[0]}"
+        usage = {"prompt_tokens": len(prompt.split()), "completion_tokens": len(text.split())}
+
+        if not body.get("stream"):
+            self._send(200, {"choices": [{"message": {"role": "assistant", "content": text}}], "usage": usage})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(b": OPENROUTER PROCESSING\n\n")
+        for i in range(0, len(text), 6):
+            chunk = {"choices": [{"delta": {"content": text[i:i + 6]}}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(self.config.llm_token_ms / 1000)
+        self.wfile.write(f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n".encode())
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+
+class StubServer:
+    """Runs the stub APIs on a background thread: ``with StubServer(config) as stub: stub.url``."""
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        handler = type("ConfiguredStubHandler", (StubHandler,), {"config": config or StubConfig(), "counts": {}})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.handler = handler
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="stub-server", daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def counts(self):
+        return dict(self.handler.counts)
+
+    def env(self):
+        """Environment settings that route every upstream call to this server."""
+        return {
+            "OPENROUTER_BASE_URL": f"{self.url}/api/v1",
+            "API_NINJAS_BASE_URL": self.url,
+            "WHOXY_BASE_URL": self.url,
+            "RDAP_BASE_URL": self.url,
+        }
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def add_config_args(parser):
+    defaults = StubConfig()
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=defaults.jitter_ms)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--rate-limit-rate", type=float, default=defaults.rate_limit_rate)
+    parser.add_argument("--retry-after", type=int, default=defaults.retry_after)
+    parser.add_argument("--registered-ratio", type=float, default=defaults.registered_ratio)
+    parser.add_argument("--llm-latency-ms", type=float, default=defaults.llm_latency_ms)
+    parser.add_argument("--llm-token-ms", type=float, default=defaults.llm_token_ms)
+
+
+def config_from_args(args):
+    return StubConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate,
+                      args.retry_after, args.registered_ratio, args.llm_latency_ms, args.llm_token_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve local stand-ins for the upstream APIs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8999)
+    add_config_args(parser)
+    args = parser.parse_args()
+
+    server = StubServer(config_from_args(args), args.host, args.port)
+    for key, value in server.env().items():
+        print(f"{key}={value}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
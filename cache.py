@@ -0,0 +1,86 @@
+import os
+import sqlite3
+import threading
+import time
+
+
+class TTLCache:
+    """Small key/value cache in a local SQLite file.
+
+    Every entry carries its own expiry, so callers can pick a TTL per value.
+    Entries are evicted least-recently-used once the table grows past
+    ``max_entries``. The file is shared by every process that opens it (WAL
+    mode), and each thread gets its own connection.
+    """
+
+    TRIM_EVERY = 100  # writes between eviction passes
+
+    def __init__(self, path, table="cache", max_entries=50_000):
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._connect().execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._connect().execute(f"CREATE INDEX IF NOT EXISTS {table}_last_used ON {table} (last_used)")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute(f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at <= now:
+            conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            return None
+        conn.execute(f"UPDATE {self.table} SET last_used = ? WHERE key = ?", (now, key))
+        return value
+
+    def set(self, key, value, ttl):
+        if ttl <= 0:
+            return
+        now = time.time()
+        self._connect().execute(
+            f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+            (key, value, now + ttl, now),
+        )
+        with self._lock:
+            self._writes += 1
+            trim = self._writes % self.TRIM_EVERY == 0
+        if trim:
+            self.trim()
+
+    def trim(self):
+        conn = self._connect()
+        conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),))
+        conn.execute(
+            f"DELETE FROM {self.table} WHERE key IN ("
+            f" SELECT key FROM {self.table} ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def clear(self):
+        self._connect().execute(f"DELETE FROM {self.table}")
+
+
+def open_cache(env_var, default_file, table, max_entries):
+    # "<ENV_VAR>=off" turns a cache off; any other value is the SQLite file to use
+    path = os.getenv(env_var, os.path.join(os.path.dirname(os.path.abspath(__file__)), default_file))
+    if path.lower() in ("", "off", "0", "false"):
+        return None
+    return TTLCache(path, table=table, max_entries=max_entries)
@@ -0,0 +1,69 @@
+import threading
+import time
+
+import metrics
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+BREAKER_STATE = metrics.gauge("provider_breaker_state", "1 for each provider's current breaker state, 0 for the others")
+BREAKER_FAILURES = metrics.gauge("provider_breaker_consecutive_failures", "Failures in a row per provider")
+
+
+class CircuitBreaker:
+    """Stops calling a provider after ``failure_threshold`` failures in a row.
+
+    While open, ``allow()`` is False and callers fail over immediately. After
+    ``reset_timeout`` seconds one trial call is let through (half-open); its
+    outcome closes the breaker again or re-opens it for another period.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.last_error = None
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+        self._set_state(CLOSED)
+
+    def _set_state(self, state):
+        self.state = state
+        for name in (CLOSED, OPEN, HALF_OPEN):
+            BREAKER_STATE.set(int(name == state), provider=self.name, state=name)
+        BREAKER_FAILURES.set(self.failures, provider=self.name)
+
+    def allow(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._set_state(HALF_OPEN)
+                self._trial_running = False
+            if self.state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def release(self):
+        # The call allow() let through was never made (its lookup was cancelled); count nothing
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._trial_running = False
+            self._set_state(CLOSED)
+
+    def record_failure(self, error):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)
+            self._trial_running = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(OPEN)
+            else:
+                BREAKER_FAILURES.set(self.failures, provider=self.name)
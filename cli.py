@@ -0,0 +1,175 @@
+"""Headless batch mode: generate names and check domains for a file of keyword lines.
+
+    python cli.py keywords.txt --count 10 --format csv -o results.csv
+    cat keywords.txt | python cli.py - --format jsonl >> results.jsonl
+    python cli.py keywords.txt -o results.jsonl --resume   # skip keyword sets already in the file
+    python cli.py keywords.txt --tlds popular --stop-after 3 --skip-cctlds-if-com
+
+Rows carry the structured lookup result: status is one of available, taken,
+error, skipped (left out by --stop-after / --skip-cctlds-if-com) or invalid
+(a name that can't be registered), with the reason in the error column,
+alongside the answering provider, latency and check time.
+
+Every keyword set's rows are written together and flushed, so an interrupted
+run leaves only complete keyword sets behind and ``--resume`` can pick up
+where it stopped.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from domain_checker import EXTENSIONS, check_many, domain_label
+from name_generator import generate_startup_names
+from pipeline import VARIANTS, find_available_names
+from tld_policy import TLD_SETS, TldPolicy, parse_tlds
+
+INTERRUPTED = 130
+
+FIELDS = ["keywords", "name", "suggested", "domain", "status", "provider", "latency_ms", "checked_at", "source", "error"]
+
+
+def read_keywords(source):
+    lines = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    with lines:
+        seen = set()
+        for line in lines:
+            keywords = line.strip()
+            if keywords and not keywords.startswith("#") and keywords not in seen:
+                seen.add(keywords)
+                yield keywords
+
+
+def completed_keywords(path, fmt):
+    """Keyword sets that already have rows in an earlier output file."""
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            return {row["keywords"] for row in csv.DictReader(f) if row.get("keywords")}
+        done = set()
+        for line in f:
+            try:
+                done.add(json.loads(line)["keywords"])
+            except (ValueError, KeyError):
+                continue  # a line cut short by the interruption
+        return done
+
+
+def process(keywords, count, policy, required_tlds=None, variants=None):
+    tlds = policy.tlds
+    if required_tlds:
+        names, suggested, results = [], "", {}
+        for event in find_available_names(keywords, count, required_tlds, policy=policy,
+                                          variants=VARIANTS if variants is None else variants):
+            if event[0] == "name":
+                names.append(event[1])
+                results[event[1]] = {f"{domain_label(event[1])}{ext}": None for ext in tlds}
+            elif event[0] == "result":
+                results[event[1]][event[2].domain] = event[2]
+            else:
+                suggested = event[1]
+    else:
+        names, suggested = generate_startup_names(keywords, count)
+        results = {name: {f"{domain_label(name)}{ext}": None for ext in tlds} for name in names}
+        for name, result in check_many(names, policy=policy):
+            results[name][result.domain] = result
+    return [
+        {"keywords": keywords, "name": name, "suggested": name == suggested, **result.to_row()}
+        for name in names
+        for result in results[name].values()
+        if result is not None
+    ]
+
+
+class RowWriter:
+    def __init__(self, out, fmt, write_header):
+        self.out = out
+        self.fmt = fmt
+        self._lock = threading.Lock()
+        self._csv = csv.DictWriter(out, fieldnames=FIELDS) if fmt == "csv" else None
+        if self._csv and write_header:
+            self._csv.writeheader()
+
+    def write(self, rows):
+        with self._lock:
+            for row in rows:
+                if self._csv:
+                    self._csv.writerow(row)
+                else:
+                    self.out.write(json.dumps(row, ensure_ascii=False) + "\n")
+            self.out.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate startup names and check their domains in bulk.")
+    parser.add_argument("input", help="file with one keyword set per line, or - for stdin")
+    parser.add_argument("-o", "--output", help="write here instead of stdout (appended to with --resume)")
+    parser.add_argument("-f", "--format", choices=["jsonl", "csv"], default="jsonl")
+    parser.add_argument("-n", "--count", type=int, default=5, help="names per keyword set")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="keyword sets processed at once")
+    parser.add_argument("--tlds", default=",".join(EXTENSIONS),
+                        help=f"comma- or space-separated in priority order, e.g. .com,.ai; set names expand: {', '.join(TLD_SETS)}")
+    parser.add_argument("--stop-after", type=int, metavar="N", help="stop checking a name's TLDs once N are available")
+    parser.add_argument("--skip-cctlds-if-com", action="store_true", help="skip two-letter TLDs for names whose .com is free")
+    parser.add_argument("--require-available", metavar="TLDS",
+                        help="only keep names with these TLDs available, e.g. .com (oversamples the model)")
+    parser.add_argument("--variants", type=int, default=None, metavar="K",
+                        help="with --require-available, also check the K best local variants of each round's names")
+    parser.add_argument("--resume", action="store_true", help="skip keyword sets already in --output")
+    args = parser.parse_args(argv)
+
+    ignored = []
+    tlds = parse_tlds(args.tlds, ignored)
+    required = parse_tlds(args.require_available, ignored) if args.require_available else None
+    if ignored or not tlds:
+        parser.error(f"not valid TLDs: {', '.join(ignored) or args.tlds!r}")
+    policy = TldPolicy(tlds, stop_after=args.stop_after, skip_cctlds_if_com=args.skip_cctlds_if_com)
+    skip = completed_keywords(args.output, args.format) if args.resume else set()
+    pending = [k for k in read_keywords(args.input) if k not in skip]
+    if skip:
+        print(f"Resuming: {len(skip)} keyword sets already done, {len(pending)} to go.", file=sys.stderr)
+
+    appending = args.resume and args.output and os.path.exists(args.output)
+    out = open(args.output, "a" if appending else "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    writer = RowWriter(out, args.format, write_header=not appending)
+
+    failed = 0
+    pool = ThreadPoolExecutor(max_workers=max(1, args.concurrency), thread_name_prefix="cli")
+    try:
+        futures = {pool.submit(process, k, args.count, policy, required, args.variants): k for k in pending}
+        for future in as_completed(futures):
+            try:
+                rows = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"❌ {futures[future]}: {e}", file=sys.stderr)
+                continue
+            if rows:
+                writer.write(rows)
+            else:
+                failed += 1
+                print(f"⚠️ {futures[future]}: no names generated", file=sys.stderr)
+    except KeyboardInterrupt:
+        print("Interrupted; rerun with --resume to continue.", file=sys.stderr)
+        pool.shutdown(wait=False, cancel_futures=True)
+        return INTERRUPTED
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    pool.shutdown()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    code = main()
+    if code == INTERRUPTED:
+        # Exiting normally would wait for every generation and lookup still running on the
+        # worker threads (up to the generation deadline); finished keyword sets are already written
+        sys.stdout.flush()
+        os._exit(code)
+    sys.exit(code)
@@ -0,0 +1,60 @@
+import socket
+
+try:
+    import dns.exception
+    import dns.resolver
+except ImportError:  # dnspython is optional; fall back to the system resolver
+    dns = None
+
+DNS_TIMEOUT = 2.0
+
+
+def dnspython_resolver(domain):
+    """True if the zone has NS or SOA records, i.e. it is delegated and therefore registered."""
+    resolver = dns.resolver.Resolver()
+    resolver.lifetime = DNS_TIMEOUT
+    for rdtype in ("NS", "SOA"):
+        try:
+            resolver.resolve(domain, rdtype)
+            return True
+        except dns.resolver.NXDOMAIN:
+            return False
+        except (dns.resolver.NoAnswer, dns.resolver.NoNameservers, dns.exception.Timeout):
+            continue
+    return False
+
+
+def socket_resolver(domain):
+    # Only sees A/AAAA records, so it catches fewer taken domains, but never a false "Taken"
+    try:
+        socket.getaddrinfo(domain, None)
+        return True
+    except (socket.gaierror, UnicodeError):
+        return False
+
+
+class StaticResolver:
+    """Resolver that answers from a fixed set of domains (for tests and offline runs)."""
+
+    def __init__(self, registered=()):
+        self.registered = {d.lower() for d in registered}
+
+    def __call__(self, domain):
+        return domain.lower() in self.registered
+
+
+_resolver = dnspython_resolver if dns is not None else socket_resolver
+
+
+def set_resolver(resolver):
+    """Swap the resolver used by ``resolves``; any callable domain -> bool works."""
+    global _resolver
+    _resolver = resolver
+
+
+def resolves(domain):
+    # A resolver failure just means "unknown": the domain goes on to the paid lookup
+    try:
+        return bool(_resolver(domain))
+    except Exception:
+        return False
@@ -1,44 +1,252 @@
+import logging
 import os
-import requests
+import sqlite3
+import time
+from itertools import chain
+from concurrent.futures import FIRST_COMPLETED, Future, InvalidStateError, ThreadPoolExecutor, wait
 from dotenv import load_dotenv
+from cache import open_cache
+import dns_lookup
+from known_index import open_index
+import metrics
+import providers
+from results import DomainResult, Status
+from singleflight import SingleFlight
+from tld_policy import TLD_SETS, TldPolicy, parse_tlds
+from normalise import InvalidName, canonical, to_label
 
 load_dotenv()
-API_NINJAS_KEY = os.getenv("API_NINJAS_KEY")
-WHOSXY_API_KEY = os.getenv("WHOSXY_API_KEY")
+logger = logging.getLogger(__name__)
 
-def check_domain_availability(name):
-    # extensions = ['.com', '.in', '.net', '.ai', '.co', '.io']
-    extensions = ['.com', '.in', '.ai', '.co']
-    results = {}
-
-    for ext in extensions:
-        domain = f"{name.lower()}{ext}"
-
-        if ext == ".com":
-            url = f"https://api.api-ninjas.com/v1/domainlookup?domain={domain}"
-            headers = {"X-Api-Key": API_NINJAS_KEY}
-            try:
-                r = requests.get(url, headers=headers, timeout=10)
-                if r.status_code == 404:
-                    results[domain] = "✅ Available"
-                    continue
-                r.raise_for_status()
-                data = r.json()
-                results[domain] = "❌ Taken" if data.get("is_registered") else "✅ Available"
-            except Exception as e:
-                results[domain] = f"⚠️ Error (.com): {e}"
+# Default TLDs in priority order; DOMAIN_TLDS takes a list and/or set names from tld_policy.TLD_SETS
+_ignored = []
+EXTENSIONS = parse_tlds(os.getenv("DOMAIN_TLDS", ".com,.in,.ai,.co"), _ignored) or TLD_SETS["default"]
+if _ignored:
+    logger.warning("⚠️ DOMAIN_TLDS: ignored invalid TLDs %s", ", ".join(_ignored))
+
+# One pool for the whole process for the local steps (cache, index, DNS); provider
+# calls run on each provider's own pool (see providers.submit)
+MAX_WORKERS = int(os.getenv("DOMAIN_CHECK_WORKERS", "16"))
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="domain-check")
+
+# Results are cached on disk and shared by every Streamlit session and process.
+# Taken domains rarely free up, available ones can be registered any minute,
+# and errors are only kept long enough to stop hammering a failing backend.
+CACHE_TTL_TAKEN = int(os.getenv("DOMAIN_CACHE_TTL_TAKEN", str(7 * 24 * 3600)))
+CACHE_TTL_AVAILABLE = int(os.getenv("DOMAIN_CACHE_TTL_AVAILABLE", "3600"))
+CACHE_TTL_ERROR = int(os.getenv("DOMAIN_CACHE_TTL_ERROR", "60"))
+
+_cache = open_cache("DOMAIN_CACHE_PATH", "domain_cache.sqlite3", "domain_status",
+                    int(os.getenv("DOMAIN_CACHE_MAX_ENTRIES", "50000")))
+
+# Registered domains almost always resolve, so a DNS hit marks them taken
+# without spending a paid WHOIS call; everything else still goes to the backend.
+DNS_PREFILTER = os.getenv("DNS_PREFILTER", "on").lower() not in ("off", "0", "false")
+
+# Sessions asking for the same domain at the same time share one lookup
+_flights = SingleFlight("domain_lookup", timeout=float(os.getenv("LOOKUP_SINGLEFLIGHT_TIMEOUT", "60")))
+
+# Local Bloom filter of domains already seen taken; a hit skips the network entirely.
+# Its entries age out on the same schedule as cached "Taken" answers.
+_known = open_index(CACHE_TTL_TAKEN)
+
+LOOKUP_SECONDS = metrics.histogram("domain_lookup_seconds", "Time to answer one domain lookup, cache hits included")
+LOOKUPS = metrics.counter("domain_lookups_total", "Domain lookups by TLD, source, answering provider and outcome")
+CACHE_REQUESTS = metrics.counter("domain_cache_requests_total", "Domain result cache hits and misses")
+
+
+CACHE_TTLS = {Status.TAKEN: CACHE_TTL_TAKEN, Status.AVAILABLE: CACHE_TTL_AVAILABLE, Status.ERROR: CACHE_TTL_ERROR}
+
+
+def _from_cache(domain):
+    if _cache is None:
+        return None
+    try:
+        raw = _cache.get(domain)
+        result = DomainResult.from_json(domain, raw) if raw is not None else None
+    except (sqlite3.Error, ValueError, TypeError):
+        result = None  # a broken cache file or an old entry must never block a lookup
+    CACHE_REQUESTS.inc(result="miss" if result is None else "hit")
+    return result
 
+
+def _to_cache(result):
+    if _cache is None:
+        return
+    try:
+        _cache.set(result.domain, result.to_json(), CACHE_TTLS[result.status])
+    except sqlite3.Error:
+        pass
+
+
+def _local_lookup(domain):
+    # (result, fresh?) from the cache, the known-taken index or DNS; (None, False) if only a provider can tell
+    result = _from_cache(domain)
+    if result is None and _known is not None and domain in _known:
+        result = DomainResult(domain, Status.TAKEN, "index", source="index")
+    if result is not None:
+        return result, False
+    started = time.perf_counter()
+    if DNS_PREFILTER and dns_lookup.resolves(domain):
+        return DomainResult(domain, Status.TAKEN, "dns", time.perf_counter() - started), True
+    return None, False
+
+
+def _settle(future, result=None, error=None):
+    try:
+        if error is not None:
+            future.set_exception(error)
         else:
-            url = f"https://api.whoxy.com/?key={WHOSXY_API_KEY}&whois={domain}"
-            try:
-                r = requests.get(url, timeout=10)
-                r.raise_for_status()
-                data = r.json()
-                if data.get("status") == 1 and "domain" in data:
-                    results[domain] = "❌ Taken"
-                else:
-                    results[domain] = "✅ Available"
-            except Exception as e:
-                results[domain] = f"⚠️ Error ({ext}): {e}"
-
-    return results
+            future.set_result(result)
+    except InvalidStateError:
+        pass  # every caller gave up on it meanwhile; the result is still cached
+
+
+def _start_lookup(domain, ext):
+    # The shared pool only runs the local steps; a lookup that needs a provider moves to
+    # that provider's pool, so a throttled provider never holds a shared worker
+    started = time.perf_counter()
+    outcome = Future()
+    local = _executor.submit(_local_lookup, domain)
+
+    def finish(result, fresh):
+        if fresh:
+            _to_cache(result)
+            if _known is not None and result.status is Status.TAKEN:
+                _known.add(domain)
+        LOOKUP_SECONDS.observe(time.perf_counter() - started, tld=ext, source=result.source)
+        LOOKUPS.inc(tld=ext, source=result.source, provider=result.provider, outcome=result.status.value)
+        _settle(outcome, result)
+
+    def answered_locally(future):
+        if future.cancelled() or outcome.cancelled():
+            return
+        try:
+            result, fresh = future.result()
+        except Exception as e:
+            _settle(outcome, error=e)
+            return
+        if result is not None:
+            finish(result, fresh)
+        else:
+            remote = providers.submit(domain, ext)
+            # Cancelling the lookup drops its provider calls that have not gone out yet
+            outcome.add_done_callback(lambda f: f.cancelled() and remote.cancel())
+            remote.add_done_callback(lambda f: f.cancelled() or finish(f.result(), True))
+
+    local.add_done_callback(answered_locally)
+    outcome.add_done_callback(lambda f: f.cancelled() and local.cancel())
+    return outcome
+
+
+def domain_label(name):
+    # "Glow Ly." -> "glowly", "Café" -> "xn--caf-dma"; "" for a name that can't be registered
+    return canonical(name) or ""
+
+
+def _rejected(name, tlds):
+    # Unregistrable names get their answer here instead of a paid lookup that would only error;
+    # blank ones are just ignored, as they always were
+    if not name.strip():
+        return []
+    try:
+        to_label(name)
+    except InvalidName as e:
+        shown = name.strip().replace(" ", "").lower()
+        return [DomainResult.invalid(f"{shown}{ext}", str(e)) for ext in tlds]
+    return []
+
+
+def submit_lookup(domain, ext):
+    """Queue one domain on the shared lookup pool and return its Future.
+
+    A lookup for the same domain already queued or running, from any session,
+    is joined instead of repeated.
+    """
+    return _flights.attach(domain, lambda: _start_lookup(domain, ext))
+
+
+class PlanRunner:
+    """Drives TLD plans (see tld_policy) over the shared lookup pool.
+
+    ``start()`` sends a plan's first wave; ``results()`` yields (plan,
+    DomainResult) as lookups finish, sends each plan's next wave once its
+    current one is in, and finally yields the TLDs the plan skipped.
+    """
+
+    def __init__(self):
+        self._futures = {}  # future -> (plan, domain)
+
+    def start(self, plan):
+        wave = plan.next_wave()
+        for domain, ext in wave:
+            self._futures[submit_lookup(domain, ext)] = (plan, domain)
+        if not wave:
+            return plan.skipped()
+        return []
+
+    def results(self):
+        while self._futures:
+            done, _ = wait(self._futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                plan, domain = self._futures.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = DomainResult.failed(domain, e)
+                plan.record(result)
+                yield plan, result
+                if not plan.waiting:
+                    for skipped in self.start(plan):
+                        yield plan, skipped
+
+
+def lookup_domains(name, tlds=None, policy=None):
+    """Look up every TLD for one name; returns {domain: DomainResult} in TLD order."""
+    policy = policy or TldPolicy(tlds or EXTENSIONS)
+    label = domain_label(name)
+    if not label:
+        return {result.domain: result for result in _rejected(name, policy.tlds)}
+    plan = policy.plan(label)
+    runner = PlanRunner()
+    for _ in runner.start(plan):
+        pass
+    for _ in runner.results():
+        pass
+    return {plan.domain(ext): plan.results[plan.domain(ext)] for ext in policy.tlds}
+
+
+def check_domain_availability(name):
+    # {domain: "✅ Available" / "❌ Taken" / "⚠️ Error (.ai): ..."}, as this function has always returned
+    return {domain: result.label for domain, result in lookup_domains(name).items()}
+
+
+def check_many(names, tlds=None, policy=None):
+    """Check many names at once, yielding (name, DomainResult) as each lookup finishes.
+
+    Names sharing a domain label (e.g. "Glowly" and "glowly.") are looked up
+    once and reported for each of them; names that can't be registered get
+    invalid results straight away. With an early-exit ``policy``, TLDs it
+    leaves out are yielded as skipped results at the end of their name's plan.
+    """
+    policy = policy or TldPolicy(tlds or EXTENSIONS)
+    owners = {}  # label -> names
+    runner = PlanRunner()
+    started = []
+    rejected = []
+    for name in names:
+        label = domain_label(name)
+        if not label:
+            rejected.extend((name, result) for result in _rejected(name, policy.tlds))
+            continue
+        if label not in owners:
+            owners[label] = []
+            plan = policy.plan(label)
+            started.extend((plan, result) for result in runner.start(plan))
+        if name not in owners[label]:
+            owners[label].append(name)
+
+    yield from rejected
+    for plan, result in chain(started, runner.results()):
+        for name in owners[plan.label]:
+            yield name, result
@@ -0,0 +1,100 @@
+"""CSV and PDF exports of a generation run, memoised on a hash of their content.
+
+Streamlit reruns the whole script on every interaction; with these helpers a
+rerun that did not change the results reuses the bytes built last time, and
+the PDF is only built when someone asks for it. Exports are built in memory
+(a run is at most a few hundred rows) and the last CACHE_SIZE of them are
+kept, across all sessions.
+"""
+
+import csv
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+
+COLUMNS = ["Name", "Suggested", "Domain", "Status", "Provider"]
+PDF_COLUMNS = ["Name", "Suggested", "Domain", "Status"]
+PDF_ROWS_PER_TABLE = 200  # ReportLab lays out one big table in one go; chunks keep memory flat
+CACHE_SIZE = 16
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def export_rows(names, suggested, domain_results):
+    """Flatten a run into tuples in COLUMNS order."""
+    for name in names:
+        flag = "Yes" if name == suggested else "No"
+        for domain, result in domain_results.get(name, {}).items():
+            yield (name, flag, domain, result.label, result.provider)
+
+
+def digest(keywords, timestamp, rows):
+    h = hashlib.sha256(json.dumps([keywords, timestamp], ensure_ascii=False).encode())
+    for row in rows:
+        h.update(json.dumps(row, ensure_ascii=False).encode())
+    return h.hexdigest()
+
+
+def _memoised(key, build):
+    with _memo_lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            return _memo[key]
+    value = build()
+    with _memo_lock:
+        _memo[key] = value
+        while len(_memo) > CACHE_SIZE:
+            _memo.popitem(last=False)
+    return value
+
+
+def build_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def build_pdf(keywords, rows, timestamp):
+    # ReportLab is only imported when a PDF is actually requested
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    styles = getSampleStyleSheet()
+    elements = [Paragraph("AI Startup Name Suggestions", styles["Title"]), Spacer(1, 12)]
+    elements.append(Paragraph(f"<para align='center'><b>Keywords:</b> {keywords}<br/><b>Generated On:</b> {timestamp}</para>", styles["Normal"]))
+    elements.append(Spacer(1, 12))
+
+    style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#f0f0f0")),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+    ])
+    body = [list(row[:len(PDF_COLUMNS)]) for row in rows]
+    for start in range(0, max(len(body), 1), PDF_ROWS_PER_TABLE):
+        table = Table([PDF_COLUMNS] + body[start:start + PDF_ROWS_PER_TABLE], repeatRows=1)
+        table.setStyle(style)
+        elements.append(table)
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+def csv_bytes(keywords, timestamp, rows):
+    rows = list(rows)
+    return _memoised(("csv", digest(keywords, timestamp, rows)), lambda: build_csv(rows))
+
+
+def pdf_bytes(keywords, timestamp, rows):
+    rows = list(rows)
+    return _memoised(("pdf", digest(keywords, timestamp, rows)), lambda: build_pdf(keywords, rows, timestamp))
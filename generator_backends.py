@@ -0,0 +1,255 @@
+"""Where generated names come from: OpenRouter or a small local model.
+
+    NAME_BACKEND=openrouter       # default: chat completions over HTTP
+    NAME_BACKEND=local            # transformers on CPU, no network, no per-token cost
+    NAME_FALLBACK_BACKEND=local   # top up from the local model when OpenRouter comes up short
+
+A backend turns chat ``messages`` into text: ``complete()`` returns the whole
+answer, ``stream()`` yields it in pieces as it is produced. Both raise on
+failure; name_generator owns prompts, parsing, retries and caching.
+
+The local backend loads LOCAL_MODEL once per process on first use (callers
+still time out after ``read_timeout`` while it loads, and a failed load is
+tried again on the next request), and prompts arriving from concurrent sessions within LOCAL_BATCH_WAIT_MS are run
+through ``generate()`` together as one padded batch. LOCAL_MODEL_DTYPE
+picks float32, bfloat16 or int8 (dynamic quantisation of the linear layers).
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FuturesTimeout
+
+import requests
+from dotenv import load_dotenv
+
+import http_client
+import metrics
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+API_KEY = os.getenv("OPENROUTER_API_KEY")
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1").rstrip("/")
+OPENROUTER_URL = f"{OPENROUTER_BASE_URL}/chat/completions"
+MODEL = "mistralai/mixtral-8x7b-instruct"
+
+LOCAL_MODEL = os.getenv("LOCAL_MODEL", "Qwen/Qwen2.5-0.5B-Instruct")
+LOCAL_MODEL_DTYPE = os.getenv("LOCAL_MODEL_DTYPE", "bfloat16").lower()
+LOCAL_MAX_NEW_TOKENS = int(os.getenv("LOCAL_MAX_NEW_TOKENS", "160"))
+LOCAL_BATCH_SIZE = int(os.getenv("LOCAL_BATCH_SIZE", "8"))
+LOCAL_BATCH_WAIT = float(os.getenv("LOCAL_BATCH_WAIT_MS", "25")) / 1000
+LOCAL_THREADS = int(os.getenv("LOCAL_THREADS", "0"))  # torch intra-op threads; 0 keeps torch's default
+
+LLM_TOKENS = metrics.counter("llm_tokens_total", "Tokens used for name generation, by backend and kind")
+LOCAL_BATCH_SIZES = metrics.histogram("local_generation_batch_size", "Prompts per local generate() call",
+                                      buckets=(1, 2, 4, 8, 16, 32))
+
+
+def record_usage(usage, backend="openrouter"):
+    for kind in ("prompt_tokens", "completion_tokens"):
+        if usage and usage.get(kind):
+            LLM_TOKENS.inc(usage[kind], kind=kind.split("_")[0], backend=backend)
+
+
+class OpenRouterBackend:
+    name = "openrouter"
+    model = MODEL
+
+    def _request(self, messages, **extra):
+        headers = {
+            "Authorization": f"Bearer {API_KEY}",
+            "HTTP-Referer": "http://localhost",  # Optional
+            "Content-Type": "application/json"
+        }
+        return headers, {"model": self.model, "messages": messages, **extra}
+
+    def complete(self, messages, read_timeout=http_client.LLM_READ_TIMEOUT):
+        headers, data = self._request(messages)
+        response = http_client.post(OPENROUTER_URL, read_timeout=read_timeout, headers=headers, json=data)
+        response.raise_for_status()
+        content = response.json()
+        record_usage(content.get("usage"))
+        return content["choices"][0]["message"]["content"]
+
+    def stream(self, messages, deadline=None):
+        # Server-Sent Events: "data: {json chunk}" lines, ": comment" keep-alives, "data: [DONE]".
+        # The read timeout applies between chunks; ``deadline`` (time.monotonic()) bounds the
+        # whole response, since keep-alives alone would never trip the read timeout.
+        headers, data = self._request(messages, stream=True, usage={"include": True})
+        with http_client.post(OPENROUTER_URL, headers=headers, json=data, stream=True) as response:
+            response.raise_for_status()
+            response.encoding = "utf-8"  # SSE is always UTF-8; without a charset requests would assume Latin-1
+            for event in response.iter_lines(decode_unicode=True):
+                if deadline is not None and time.monotonic() > deadline:
+                    raise requests.exceptions.Timeout("generation deadline reached while streaming")
+                if not event or event.startswith(":") or not event.startswith("data:"):
+                    continue
+                payload = event[len("data:"):].strip()
+                if payload == "[DONE]":
+                    return
+                chunk = json.loads(payload)
+                record_usage(chunk.get("usage"))
+                choices = chunk.get("choices") or []
+                if choices:
+                    text = (choices[0].get("delta") or {}).get("content")
+                    if text:
+                        yield text
+
+
+class LocalBackend:
+    """A small instruct model on CPU, shared by every session in the process."""
+
+    name = "local"
+
+    def __init__(self, model=LOCAL_MODEL, dtype=LOCAL_MODEL_DTYPE, batch_size=LOCAL_BATCH_SIZE,
+                 batch_wait=LOCAL_BATCH_WAIT, max_new_tokens=LOCAL_MAX_NEW_TOKENS):
+        self.model = model
+        self.dtype = dtype
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.max_new_tokens = max_new_tokens
+        self._requests = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        self._tokenizer = None
+        self._model = None
+
+    def _load(self):
+        # Heavy imports stay out of the app's start-up until someone asks for a local generation
+        try:
+            import torch
+            from transformers import AutoModelForCausalLM, AutoTokenizer
+        except ImportError as e:
+            raise RuntimeError(f"NAME_BACKEND=local needs torch and transformers installed ({e})") from e
+
+        started = time.perf_counter()
+        if LOCAL_THREADS:
+            torch.set_num_threads(LOCAL_THREADS)
+        tokenizer = AutoTokenizer.from_pretrained(self.model, padding_side="left")
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        torch_dtype = torch.bfloat16 if self.dtype == "bfloat16" else torch.float32
+        model = AutoModelForCausalLM.from_pretrained(self.model, torch_dtype=torch_dtype)
+        if self.dtype == "int8":
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        model.eval()
+        self._tokenizer, self._model = tokenizer, model
+        logger.info("🧠 Loaded %s (%s) in %.1fs", self.model, self.dtype, time.perf_counter() - started)
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._serve, name="local-generation", daemon=True)
+                self._worker.start()
+
+    def complete(self, messages, read_timeout=http_client.LLM_READ_TIMEOUT):
+        self._ensure_worker()
+        future = Future()
+        self._requests.put((messages, future))
+        try:
+            return future.result(timeout=read_timeout)
+        except FuturesTimeout:
+            future.cancel()  # still queued, e.g. behind the model load: the worker drops it
+            raise
+
+    def stream(self, messages, deadline=None):
+        # Batched generation finishes every row together, so the answer arrives in one piece
+        read_timeout = http_client.LLM_READ_TIMEOUT
+        if deadline is not None:
+            read_timeout = max(0.0, min(read_timeout, deadline - time.monotonic()))
+        yield self.complete(messages, read_timeout=read_timeout)
+
+    def _next_batch(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return [item for item in batch if item[1].set_running_or_notify_cancel()]
+
+    def _fail_waiting(self, first, error):
+        waiting = [first]
+        while True:
+            try:
+                waiting.append(self._requests.get_nowait())
+            except queue.Empty:
+                break
+        for _, future in waiting:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(error)
+
+    def _serve(self):
+        while True:
+            first = self._requests.get()
+            if self._model is None:
+                # Loaded by the first request to need it; after a failure the next request tries again
+                try:
+                    self._load()
+                except Exception as e:
+                    logger.error("❌ Local model unavailable: %s", e)
+                    self._fail_waiting(first, e)
+                    continue
+            batch = self._next_batch(first)
+            if not batch:
+                continue
+            try:
+                texts = self._generate([messages for messages, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future), text in zip(batch, texts):
+                    future.set_result(text)
+
+    def _generate(self, conversations):
+        import torch
+
+        tokenizer, model = self._tokenizer, self._model
+        prompts = [tokenizer.apply_chat_template(messages, add_generation_prompt=True, tokenize=False)
+                   for messages in conversations]
+        inputs = tokenizer(prompts, return_tensors="pt", padding=True)
+        LOCAL_BATCH_SIZES.observe(len(prompts))
+        with torch.inference_mode():
+            output = model.generate(**inputs, max_new_tokens=self.max_new_tokens, do_sample=True,
+                                    temperature=0.9, top_p=0.95, pad_token_id=tokenizer.pad_token_id)
+        # Left padding puts every prompt's end at the same column
+        completions = output[:, inputs["input_ids"].shape[1]:]
+        texts = tokenizer.batch_decode(completions, skip_special_tokens=True)
+        LLM_TOKENS.inc(int(inputs["attention_mask"].sum()), kind="prompt", backend=self.name)
+        LLM_TOKENS.inc(int((completions != tokenizer.pad_token_id).sum()), kind="completion", backend=self.name)
+        return texts
+
+
+BACKENDS = {"openrouter": OpenRouterBackend, "local": LocalBackend}
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_backend(name):
+    """One shared instance per backend name, so the local model is loaded once per process."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown name generation backend {name!r}; choose from {', '.join(BACKENDS)}")
+    with _instances_lock:
+        if name not in _instances:
+            _instances[name] = BACKENDS[name]()
+        return _instances[name]
+
+
+def primary_backend():
+    return get_backend(os.getenv("NAME_BACKEND", "openrouter").lower())
+
+
+def fallback_backend():
+    name = os.getenv("NAME_FALLBACK_BACKEND", "").lower()
+    if not name or name in ("off", "none", os.getenv("NAME_BACKEND", "openrouter").lower()):
+        return None
+    return get_backend(name)
@@ -0,0 +1,44 @@
+import os
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# One keep-alive connection pool per upstream host, shared by the whole process
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "32"))
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+LOOKUP_READ_TIMEOUT = float(os.getenv("HTTP_LOOKUP_READ_TIMEOUT", "10"))
+LLM_READ_TIMEOUT = float(os.getenv("HTTP_LLM_READ_TIMEOUT", "20"))
+
+_sessions = {}
+_lock = threading.Lock()
+
+
+def session_for(url):
+    """Return the pooled session for the host of ``url``."""
+    parts = urlsplit(url)
+    key = (parts.scheme, parts.netloc)
+    session = _sessions.get(key)
+    if session is None:
+        with _lock:
+            session = _sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, pool_block=True)
+                session.mount(f"{parts.scheme}://", adapter)
+                _sessions[key] = session
+    return session
+
+
+def timeout(read):
+    # (connect, read) so a dead host fails fast while slow answers still get their full read window
+    return (CONNECT_TIMEOUT, read)
+
+
+def get(url, read_timeout=LOOKUP_READ_TIMEOUT, **kwargs):
+    return session_for(url).get(url, timeout=timeout(read_timeout), **kwargs)
+
+
+def post(url, read_timeout=LLM_READ_TIMEOUT, **kwargs):
+    return session_for(url).post(url, timeout=timeout(read_timeout), **kwargs)
@@ -0,0 +1,228 @@
+"""Memory-mapped Bloom filter of domains we know are registered.
+
+Every live "Taken" answer is added as it comes in, and bulk lists (zone file
+extracts, earlier CSV exports, ...) can be imported:
+
+    python known_index.py import taken_domains.txt
+    python known_index.py stats
+
+A hit means "almost certainly taken" (false positives at about
+KNOWN_INDEX_FP_RATE) and costs no network round trip; a miss says nothing.
+The file is mapped, not read, so opening it is instant at any size, and
+every process that maps it sees the others' additions.
+
+Entries age out like cached "Taken" answers: the index is kept as
+generations of half the maximum age each (known_domains.<n>.bloom), only
+the current and previous ones are consulted, and older files are deleted.
+A dropped domain or a false positive is therefore checked again within
+DOMAIN_CACHE_TTL_TAKEN at most.
+"""
+
+import hashlib
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"KNIDX1\0\0"
+HEADER = struct.Struct("<8sQII")  # magic, bit count, hash count, reserved
+
+
+class BloomIndex:
+    def __init__(self, path, capacity=1_000_000, fp_rate=0.001):
+        if not os.path.exists(path):
+            bits = max(8, int(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+            hashes = max(1, round(bits / capacity * math.log(2)))
+            self._create(path, bits, hashes)
+
+        self.path = path
+        self._file = open(path, "r+b")
+        self._map = None
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            if size < HEADER.size:
+                raise ValueError(f"{path} is not a known-domain index (only {size} bytes)")
+            self._map = mmap.mmap(self._file.fileno(), 0)
+            magic, self.bits, self.hashes, _ = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a known-domain index")
+            if size < HEADER.size + (self.bits + 7) // 8:
+                raise ValueError(f"{path} is truncated")
+        except BaseException:
+            if self._map is not None:
+                self._map.close()
+            self._file.close()
+            raise
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _create(path, bits, hashes):
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, bits, hashes, 0))
+            f.truncate(HEADER.size + (bits + 7) // 8)
+        os.replace(tmp, path)  # another process may have raced us; either file is a valid empty index
+
+    def _positions(self, domain):
+        # Kirsch-Mitzenmacher double hashing: k positions from one 128-bit digest
+        digest = hashlib.blake2b(domain.lower().encode(), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        h2 |= 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def __contains__(self, domain):
+        data = self._map
+        return all(data[HEADER.size + pos // 8] & (1 << (pos % 8)) for pos in self._positions(domain))
+
+    def add(self, domain):
+        data = self._map
+        with self._lock:
+            for pos in self._positions(domain):
+                offset = HEADER.size + pos // 8
+                data[offset] |= 1 << (pos % 8)
+
+    def update(self, domains):
+        count = 0
+        for domain in domains:
+            domain = domain.strip().lower()
+            if domain and not domain.startswith("#"):
+                self.add(domain)
+                count += 1
+        self._map.flush()
+        return count
+
+    def fill_ratio(self):
+        body = self._map[HEADER.size:]
+        return sum(bin(byte).count("1") for byte in body) / self.bits
+
+    def close(self):
+        self._map.flush()
+        self._map.close()
+        self._file.close()
+
+
+class AgedIndex:
+    """BloomIndex generations covering ``max_age`` seconds between them.
+
+    Generation numbers come from the clock, so every process rotates at the
+    same moment without talking to the others. Lookups check the current and
+    previous generation; additions go to the current one.
+    """
+
+    def __init__(self, path, capacity=1_000_000, fp_rate=0.001, max_age=7 * 24 * 3600):
+        self.path = path
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.period = max(1.0, max_age / 2)
+        self._root, self._ext = os.path.splitext(path)
+        self._generation = None
+        self._open = {}  # generation -> BloomIndex, newest first
+        self._lock = threading.Lock()
+        self._rotate()
+
+    def _path(self, generation):
+        return f"{self._root}.{generation}{self._ext}"
+
+    def _rotate(self):
+        generation = int(time.time() // self.period)
+        if generation == self._generation:
+            return
+        with self._lock:
+            if generation == self._generation:
+                return
+            keep = {}
+            for number in (generation, generation - 1):
+                index = self._open.get(number)
+                if index is None and (number == generation or os.path.exists(self._path(number))):
+                    try:
+                        index = BloomIndex(self._path(number), self.capacity, self.fp_rate)
+                    except (OSError, ValueError) as e:
+                        logger.warning("⚠️ Known-domain index generation skipped: %s", e)
+                if index is not None:
+                    keep[number] = index
+            for number, index in self._open.items():
+                if number not in keep:
+                    index.close()
+            self._open, self._generation = keep, generation
+            self._remove_expired(generation - 1)
+
+    def _remove_expired(self, oldest):
+        folder = os.path.dirname(self.path) or "."
+        pattern = re.compile(re.escape(os.path.basename(self._root)) + r"\.(\d+)" + re.escape(self._ext) + "$")
+        for entry in os.listdir(folder):
+            match = pattern.match(entry)
+            if match and int(match.group(1)) < oldest:
+                try:
+                    os.remove(os.path.join(folder, entry))
+                except OSError:
+                    pass
+
+    @property
+    def current(self):
+        self._rotate()
+        return self._open.get(self._generation)
+
+    def __contains__(self, domain):
+        self._rotate()
+        return any(domain in index for index in list(self._open.values()))
+
+    def add(self, domain):
+        index = self.current
+        if index is not None:
+            index.add(domain)
+
+    def update(self, domains):
+        index = self.current
+        return index.update(domains) if index is not None else 0
+
+    def close(self):
+        with self._lock:
+            for index in self._open.values():
+                index.close()
+            self._open = {}
+
+
+def open_index(max_age=None):
+    # "KNOWN_INDEX_PATH=off" disables the index; entries live as long as cached "Taken" answers
+    path = os.getenv("KNOWN_INDEX_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "known_domains.bloom"))
+    if path.lower() in ("", "off", "0", "false"):
+        return None
+    if max_age is None:
+        max_age = int(os.getenv("DOMAIN_CACHE_TTL_TAKEN", str(7 * 24 * 3600)))
+    try:
+        return AgedIndex(path, int(os.getenv("KNOWN_INDEX_CAPACITY", "1000000")),
+                         float(os.getenv("KNOWN_INDEX_FP_RATE", "0.001")), max_age)
+    except (OSError, ValueError) as e:
+        logger.warning("⚠️ Known-domain index disabled: %s", e)
+        return None
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in ("import", "stats"):
+        print("usage: python known_index.py import FILE... | stats", file=sys.stderr)
+        return 2
+    index = open_index()
+    if index is None:
+        print("Known-domain index is disabled (KNOWN_INDEX_PATH).", file=sys.stderr)
+        return 1
+    if argv[0] == "import":
+        for path in argv[1:]:
+            with open(path, encoding="utf-8") as f:
+                print(f"{path}: {index.update(line.split(',')[0] for line in f)} domains added")
+    current = index.current
+    if current is not None:
+        print(f"{current.path}: {current.bits} bits, {current.hashes} hashes, {current.fill_ratio():.2%} full")
+    index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
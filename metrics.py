@@ -0,0 +1,206 @@
+"""In-process counters, gauges and latency histograms with Prometheus text and JSON export.
+
+    LOOKUPS = counter("domain_lookups_total", "Domain lookups by TLD and result source")
+    LOOKUPS.inc(tld=".com", source="cache")
+
+    with timed(LOOKUP_SECONDS, tld=".com"):
+        ...
+
+Set METRICS_PORT to serve /metrics (Prometheus text) and /metrics.json from
+the running process; ``snapshot()`` returns the same data as a dict.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 60.0)
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def _key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value):
+    # Prometheus text format: backslash, double quote and newline are escaped in label values
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, value=1, **labels):
+        key = _key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def samples(self):
+        with self._lock:
+            return dict(self._values)
+
+    def export(self):
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in self.samples().items()]
+
+    def to_dict(self):
+        return [{"labels": dict(key), "value": value} for key, value in self.samples().items()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = _key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def samples(self):
+        with self._lock:
+            return {key: list(series) for key, series in self._series.items()}
+
+    def export(self):
+        lines = []
+        for key, series in self.samples().items():
+            for bound, count in zip(self.buckets, series):
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', bound)])} {count}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {series[-2]}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {round(series[-1], 6)}")
+        return lines
+
+    def to_dict(self):
+        return [
+            {
+                "labels": dict(key),
+                "count": series[-2],
+                "sum": round(series[-1], 6),
+                "buckets": {str(bound): count for bound, count in zip(self.buckets, series)},
+            }
+            for key, series in self.samples().items()
+        ]
+
+
+def _register(metric):
+    with _registry_lock:
+        existing = _registry.get(metric.name)
+        if existing is not None:
+            return existing
+        _registry[metric.name] = metric
+        return metric
+
+
+def counter(name, help):
+    return _register(Counter(name, help))
+
+
+def gauge(name, help):
+    return _register(Gauge(name, help))
+
+
+def histogram(name, help, buckets=LATENCY_BUCKETS):
+    return _register(Histogram(name, help, buckets))
+
+
+@contextmanager
+def timed(histogram, **labels):
+    # Labels may be filled in inside the block, e.g. labels["outcome"] = "error"
+    started = time.perf_counter()
+    try:
+        yield labels
+    finally:
+        histogram.observe(time.perf_counter() - started, **labels)
+
+
+def export_prometheus():
+    lines = []
+    for metric in list(_registry.values()):
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.export())
+    return "\n".join(lines) + "\n"
+
+
+def snapshot():
+    return {name: {"type": m.kind, "help": m.help, "series": m.to_dict()} for name, m in list(_registry.items())}
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.startswith("/metrics.json"):
+            body, content_type = json.dumps(snapshot()).encode(), "application/json"
+        elif self.path.startswith("/metrics"):
+            body, content_type = export_prometheus().encode(), "text/plain; version=0.0.4"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=None, host="0.0.0.0"):
+    """Serve /metrics and /metrics.json on a daemon thread; safe to call on every Streamlit rerun."""
+    global _server
+    port = port if port is not None else int(os.getenv("METRICS_PORT", "0") or 0)
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError:
+                return None  # another process already serves this port
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+    return _server
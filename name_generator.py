@@ -1,79 +1,362 @@
 # name_generator.py
 
 import os
+import json
+import logging
 import requests
 from dotenv import load_dotenv
+import sqlite3
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from concurrent.futures import TimeoutError as FuturesTimeout
+import http_client
+import metrics
+from generator_backends import fallback_backend, primary_backend
+from cache import open_cache
+from rate_limit import backoff_delay
+from singleflight import SingleFlight
+from normalise import accept, canonical
 
 load_dotenv()
-API_KEY = os.getenv("OPENROUTER_API_KEY")
+logger = logging.getLogger(__name__)
+SKIP_PREFIXES = ["sure", "here", "1.", "2.", "note", "these"]
 
-def generate_startup_names(keywords, count=5, retries=2):
+# Overall time budget for one generate_startup_names call, retries included
+GENERATION_DEADLINE = float(os.getenv("NAME_GENERATION_DEADLINE", "45"))
+RETRY_BACKOFF = 1.0
+_hedge_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="llm-hedge")
+
+# Sessions sending the same prompt at the same time share one generation
+_flights = SingleFlight("name_generation", timeout=GENERATION_DEADLINE + 5)
+
+LLM_SECONDS = metrics.histogram("llm_request_seconds", "Time for one name generation request, by backend")
+LLM_RETRIES = metrics.counter("llm_retries_total", "Name generation retries, by reason")
+NAME_CACHE_REQUESTS = metrics.counter("name_cache_requests_total", "Name cache lookups: hit, partial (topped up) or miss")
+
+# Answers are cached per backend model + normalised keywords (not per count): a later
+# request for more names is served from the cache and only the rest is generated.
+NAME_CACHE_TTL = int(os.getenv("NAME_CACHE_TTL", "86400"))
+NAME_CACHE_TOP_UP = os.getenv("NAME_CACHE_TOP_UP", "on").lower() not in ("off", "0", "false")
+NAME_CACHE_MAX_NAMES = 50
+_name_cache = open_cache("NAME_CACHE_PATH", "name_cache.sqlite3", "name_generations",
+                         int(os.getenv("NAME_CACHE_MAX_ENTRIES", "5000")))
+
+
+def _build_messages(keywords, count, exclude=()):
     prompt = f"""Give exactly {count} creative, brandable startup name suggestions for this idea: "{keywords}".
 Return only the names, one per line — no numbers, no quotes, no introductions.
 
 Then in the last line, write:
 Suggested: <one best name from list>"""
+    if exclude:
+        prompt += f"\n\nDo not repeat any of these names: {', '.join(exclude)}"
+
+    return [
+        {"role": "system", "content": "You are a branding expert."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def _parse_line(line):
+    """Classify one line of model output as ("suggested", name), ("name", name) or None."""
+    line = line.strip()
+    if not line:
+        return None
+    # Handle Suggested line
+    if line.lower().startswith("suggested:"):
+        return "suggested", line.split(":", 1)[-1].strip()
+    # Only clean, valid names
+    if any(line.lower().startswith(prefix) for prefix in SKIP_PREFIXES):
+        return None
+    clean = line.strip("-•🔹 ").strip().strip("*\"'.").strip()
+    return ("name", clean) if clean else None
+
+
+def _request_names(keywords, count, exclude=(), read_timeout=http_client.LLM_READ_TIMEOUT, backend=None):
+    """One completion; returns (names, suggested) or raises on HTTP/network/model errors."""
+    backend = backend or primary_backend()
+    messages = _build_messages(keywords, count, exclude)
+    with metrics.timed(LLM_SECONDS, mode="blocking", backend=backend.name) as labels:
+        labels["outcome"] = "error"
+        ai_response = backend.complete(messages, read_timeout=read_timeout)
+        labels["outcome"] = "ok"
+
+    names = []
+    suggested_name = ""
+    for line in ai_response.strip().split("\n"):
+        parsed = _parse_line(line)
+        if parsed is None:
+            continue
+        kind, value = parsed
+        if kind == "suggested":
+            suggested_name = value
+        else:
+            names.append(value)
+    return names, suggested_name
+
+
+def _hedged_request(keywords, count, exclude, read_timeout, hedge_after, backend=None):
+    # Fire a second identical request if the first is still running after hedge_after seconds;
+    # whichever succeeds first wins.
+    futures = [_hedge_pool.submit(_request_names, keywords, count, exclude, read_timeout, backend)]
+    done, _ = wait(futures, timeout=hedge_after)
+    if not done:
+        futures.append(_hedge_pool.submit(_request_names, keywords, count, exclude, read_timeout, backend))
+    error = None
+    for future in as_completed(futures):
+        try:
+            return future.result()
+        except Exception as e:
+            error = e
+    raise error
+
+
+def _is_retryable(error):
+    # FuturesTimeout: the local backend did not answer in time, e.g. while its model loads
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout, FuturesTimeout)):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return False
+
+
+def _retry_reason(error):
+    # Metric label and log wording for a retryable error
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return ("rate_limited", "Rate limited") if status == 429 else (f"http_{status}", f"Server error {status}")
+    if isinstance(error, FuturesTimeout):
+        return "timeout", "Timed out"
+    return "network", "Network error occurred"
+
+
+def _generate_with_retries(keywords, count, retries, deadline, hedge_after, exclude, backend=None):
+    """Return (names, suggested) with up to ``count`` unique names from the model.
+
+    Short answers are topped up: each retry asks only for the missing names
+    and tells the model which ones it already gave. Retries back off with
+    jitter and stop once ``deadline`` seconds have passed. With
+    ``hedge_after`` set, a slow request is hedged with a second one.
+    Names in ``exclude`` are never returned, nor are names that can't be
+    registered or that map to the same domain label as an earlier one (see
+    normalise.py). ``backend`` defaults to NAME_BACKEND (see generator_backends).
+    """
+    started = time.monotonic()
+    names = []
+    seen = _labels(exclude)
+    suggested_name = ""
+
+    for attempt in range(retries + 1):
+        remaining = deadline - (time.monotonic() - started)
+        if remaining <= 0:
+            logger.warning("⌛ Name generation deadline reached.")
+            break
+        read_timeout = min(http_client.LLM_READ_TIMEOUT, remaining)
+        missing = count - len(names)
+        try:
+            if hedge_after:
+                batch, batch_suggested = _hedged_request(keywords, missing, [*exclude, *names], read_timeout,
+                                                         hedge_after, backend)
+            else:
+                batch, batch_suggested = _request_names(keywords, missing, [*exclude, *names], read_timeout, backend)
+        except Exception as e:
+            if not _is_retryable(e):
+                logger.error("❌ Other Error occurred: %s", e)
+                break
+            if attempt < retries:
+                reason, description = _retry_reason(e)
+                LLM_RETRIES.inc(reason=reason)
+                logger.warning("🚫 %s (%s). Retrying...", description, e)
+            else:
+                logger.error("❌ Final attempt failed: %s", e)
+        else:
+            for name in batch:
+                # Unregistrable names and repeats of an earlier label don't count; the retry asks for more
+                if len(names) < count and accept(name, seen):
+                    names.append(name)
+            suggested_name = suggested_name or batch_suggested
+            if len(names) >= count:
+                break
+            if attempt < retries:
+                LLM_RETRIES.inc(reason="short")
+                logger.warning("⚠️ Fewer names received. Retrying...")
+
+        if attempt < retries:
+            remaining = deadline - (time.monotonic() - started)
+            time.sleep(max(0.0, min(backoff_delay(attempt, base=RETRY_BACKOFF), remaining)))
+
+    return names, suggested_name
+
+
+def _labels(names):
+    # Domain labels already taken by ``names``, for dedupe ("Glowly" and "glowly." are one name)
+    return {label for label in map(canonical, names) if label}
+
 
-    headers = {
-        "Authorization": f"Bearer {API_KEY}",
-        "HTTP-Referer": "http://localhost",  # Optional
-        "Content-Type": "application/json"
-    }
+def normalise_keywords(keywords):
+    # "AI, Beauty  mehndi" and "mehndi beauty ai" ask for the same thing
+    return " ".join(sorted(set(keywords.lower().replace(",", " ").split())))
 
-    data = {
-        "model": "mistralai/mixtral-8x7b-instruct",
-        "messages": [
-            {"role": "system", "content": "You are a branding expert."},
-            {"role": "user", "content": prompt}
-        ]
-    }
 
+def _cache_key(keywords):
+    return f"{primary_backend().model}|{normalise_keywords(keywords)}"
+
+
+def _cached_names(keywords):
+    if _name_cache is None:
+        return [], ""
     try:
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers=headers,
-            json=data,
-            timeout=20
-        )
-        response.raise_for_status()
-        content = response.json()
-        ai_response = content["choices"][0]["message"]["content"]
-
-        lines = [line.strip() for line in ai_response.strip().split("\n") if line.strip()]
-        names = []
-        suggested_name = ""
-
-        for line in lines:
-            # Handle Suggested line
-            if line.lower().startswith("suggested:"):
-                suggested_name = line.split(":", 1)[-1].strip()
-            # Only clean, valid names
-            elif not any(
-                line.lower().startswith(prefix)
-                for prefix in ["sure", "here", "1.", "2.", "note", "these"]
-            ):
-                clean = line.strip("-•🔹 ").strip()
-                if clean:
-                    names.append(clean)
-
-        names = names[:count]
-
-        # Retry if fewer names than requested
-        if len(names) < count and retries > 0:
-            print("⚠️ Fewer names received. Retrying...")
-            time.sleep(2)
-            return generate_startup_names(keywords, count, retries=retries - 1)
-
-        return names, suggested_name
-
-    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
-        print("🚫 Network error occurred. Retrying..." if retries > 0 else "❌ Final attempt failed.")
-        if retries > 0:
-            time.sleep(3)
-            return generate_startup_names(keywords, count, retries=retries - 1)
+        raw = _name_cache.get(_cache_key(keywords))
+    except sqlite3.Error:
+        return [], ""
+    if raw is None:
         return [], ""
+    try:
+        entry = json.loads(raw)
+        names, suggested = entry["names"], entry["suggested"]
+        if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+            raise TypeError("names is not a list of strings")
+    except (ValueError, KeyError, TypeError):
+        return [], ""  # a broken or old-format entry is a miss, never an error
+    return names, suggested if isinstance(suggested, str) else ""
+
 
-    except Exception as e:
-        print("❌ Other Error occurred:", e)
+def _remember_names(keywords, names, suggested):
+    # Merge into what is already cached so top-ups grow the pool instead of replacing it
+    if _name_cache is None or not names:
+        return
+    cached, cached_suggested = _cached_names(keywords)
+    merged = list(cached)
+    seen = _labels(cached)
+    for name in names:
+        label = canonical(name)
+        if label and label not in seen:
+            seen.add(label)
+            merged.append(name)
+    entry = {"names": merged[:NAME_CACHE_MAX_NAMES], "suggested": cached_suggested or suggested}
+    try:
+        _name_cache.set(_cache_key(keywords), json.dumps(entry), NAME_CACHE_TTL)
+    except sqlite3.Error:
+        pass
+
+
+def _serve_cached(keywords, count, exclude=()):
+    """Cached names for these keywords (minus ``exclude``), or nothing if top-up is off and they fall short."""
+    if _name_cache is None:
         return [], ""
+    cached, suggested = _cached_names(keywords)
+    excluded = _labels(exclude)
+    served = [name for name in cached if canonical(name) and canonical(name) not in excluded][:count]
+    if len(served) < count and not NAME_CACHE_TOP_UP:
+        served = []
+    NAME_CACHE_REQUESTS.inc(result="hit" if len(served) >= count else "partial" if served else "miss")
+    return served, suggested if served else ""
+
+
+def generate_startup_names(keywords, count=5, retries=2, deadline=GENERATION_DEADLINE, hedge_after=None, exclude=()):
+    """Return (names, suggested) with up to ``count`` unique names.
+
+    Recent answers for the same normalised keywords are served from the name
+    cache; when it holds fewer than ``count`` names only the rest are asked
+    for. See ``_generate_with_retries`` for the retry and deadline rules.
+    Names in ``exclude`` are never returned. Identical prompts sent at the
+    same time from several sessions share one upstream generation.
+    """
+    served, suggested = _serve_cached(keywords, count, exclude)
+    if len(served) >= count:
+        return served, suggested
+
+    missing, excluded = count - len(served), [*exclude, *served]
+    key = (_cache_key(keywords), missing, tuple(sorted(_labels(excluded))))
+    try:
+        names, new_suggested = _flights.do(key, _generate_and_remember,
+                                           keywords, missing, retries, deadline, hedge_after, excluded)
+    except FuturesTimeout:
+        logger.warning("⌛ Timed out waiting for an identical name generation.")
+        names, new_suggested = [], ""
+    return served + list(names), suggested or new_suggested
+
+
+def _generate_and_remember(keywords, count, retries, deadline, hedge_after, exclude):
+    started = time.monotonic()
+    names, suggested = _generate_with_retries(keywords, count, retries, deadline, hedge_after, exclude)
+    fallback = fallback_backend()
+    remaining = deadline - (time.monotonic() - started)
+    if len(names) < count and fallback is not None and remaining > 0:
+        # The primary backend came up short (slow, rate limited, down): one attempt on the fallback
+        logger.warning("↪️ Topping up %d names from the %s backend.", count - len(names), fallback.name)
+        extra, extra_suggested = _generate_with_retries(keywords, count - len(names), 0, remaining, None,
+                                                        [*exclude, *names], fallback)
+        names, suggested = names + extra, suggested or extra_suggested
+    _remember_names(keywords, names, suggested)
+    return names, suggested
+
+
+class NameStream:
+    """Iterate over names while the model is still writing them.
+
+    Each name is yielded as soon as its line is complete; ``suggested`` is
+    filled in once the "Suggested:" line arrives. With the OpenRouter
+    backend the read timeout applies between chunks, and reading stops once
+    NAME_GENERATION_DEADLINE has passed; the local backend delivers its
+    answer in one piece.
+
+        stream = NameStream("beauty, AI", 5)
+        for name in stream:
+            ...
+        stream.suggested
+    """
+
+    def __init__(self, keywords, count=5):
+        self.keywords = keywords
+        self.count = count
+        self.names = []
+        self._labels = set()
+        self.suggested = ""
+
+    def __iter__(self):
+        # Cached names come out first; only the shortfall is streamed from the model
+        cached, self.suggested = _serve_cached(self.keywords, self.count)
+        self._labels = _labels(cached)
+        for name in cached:
+            self.names.append(name)
+            yield name
+        if len(self.names) >= self.count:
+            return
+
+        streamed = len(self.names)
+        backend = primary_backend()
+        messages = _build_messages(self.keywords, self.count - streamed, exclude=self.names)
+        started = time.perf_counter()
+        deadline = time.monotonic() + GENERATION_DEADLINE
+        outcome = "error"
+        try:
+            buffer = ""
+            for text in backend.stream(messages, deadline=deadline):
+                buffer += text
+                *lines, buffer = buffer.split("\n")
+                for line in lines:
+                    yield from self._take(line)
+            yield from self._take(buffer)
+            outcome = "ok"
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            logger.warning("🚫 Network error while streaming names: %s", e)
+        except Exception as e:
+            logger.error("❌ Other Error occurred: %s", e)
+        LLM_SECONDS.observe(time.perf_counter() - started, mode="stream", backend=backend.name, outcome=outcome)
+        _remember_names(self.keywords, self.names[streamed:], self.suggested)
+
+    def _take(self, line):
+        parsed = _parse_line(line)
+        if parsed is None:
+            return
+        kind, value = parsed
+        if kind == "suggested":
+            self.suggested = self.suggested or value
+        elif len(self.names) < self.count and accept(value, self._labels):
+            self.names.append(value)
+            yield value
+
+
+def stream_startup_names(keywords, count=5):
+    return NameStream(keywords, count)
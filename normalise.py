@@ -0,0 +1,105 @@
+"""Turn a generated name into the domain label we would register, or reject it.
+
+    to_label("Glowly.")        -> "glowly"
+    to_label("Salt & Light")   -> "saltandlight"
+    to_label("Café ✨")         -> "xn--caf-dma"   ("cafe" with IDN_NAMES=ascii)
+    to_label("🚀🚀")            -> InvalidName("no letters or digits")
+
+Decoration the model adds (spaces, quotes, trailing dots, emoji, ™) is
+dropped, "&" becomes "and", hyphen runs collapse and edge hyphens go. What
+is left must be a registrable label: letters, digits and inner hyphens, at
+most 63 characters once encoded. Names in other scripts or with accents are
+checked as IDNs (IDNA 2008, punycode) unless IDN_NAMES=ascii folds them to
+plain letters. All of this is local string work, so a name that could never
+be registered costs microseconds instead of a paid lookup.
+"""
+
+import os
+import re
+import unicodedata
+
+import idna
+
+import metrics
+
+MAX_LABEL_LENGTH = 63
+IDN_NAMES = os.getenv("IDN_NAMES", "punycode").lower()  # or "ascii"
+
+_LDH = re.compile(r"^[a-z0-9](?:[a-z0-9-]*[a-z0-9])?$")
+_DROP_CATEGORIES = ("P", "S", "Z", "C")  # punctuation, symbols (emoji, ™), spaces, control/format
+
+REJECTED = metrics.counter("names_rejected_total", "Generated names dropped before any lookup, by reason")
+
+
+class InvalidName(ValueError):
+    """The name cannot be turned into a registrable domain label."""
+
+
+def _keep(text):
+    # "\ufe0f" (emoji presentation selector) is a combining mark, but only ever follows an emoji
+    return "".join(ch for ch in text
+                   if ch == "-" or (ch != "\ufe0f" and not unicodedata.category(ch).startswith(_DROP_CATEGORIES)))
+
+
+def _strip_decoration(name):
+    # Symbols go before NFKC, which would otherwise spell "™" out as "TM"
+    name = unicodedata.normalize("NFKC", _keep(name.replace("&", " and ")))
+    label = re.sub("-{2,}", "-", _keep(name)).strip("-")
+    if IDN_NAMES == "ascii":
+        # Full case folding spells "ß" as "ss", the closest plain-letter form
+        decomposed = unicodedata.normalize("NFKD", label.casefold())
+        return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    # IDNA 2008 keeps "ß" (and final sigma) as letters of their own; casefold() would not
+    try:
+        return idna.uts46_remap(label, std3_rules=True, transitional=False)
+    except idna.IDNAError:
+        return label.lower()  # to_label reports what is wrong with it
+
+
+def is_ldh(label):
+    """True for a lowercase ASCII label of letters, digits and inner hyphens, at most 63 long."""
+    return len(label) <= MAX_LABEL_LENGTH and bool(_LDH.match(label))
+
+
+def to_label(name):
+    """The ASCII domain label for ``name`` (punycode for IDNs); raises InvalidName."""
+    label = _strip_decoration(name)
+    if not label:
+        raise InvalidName("no letters or digits")
+    if label.isascii():
+        if len(label) > MAX_LABEL_LENGTH:
+            raise InvalidName(f"longer than {MAX_LABEL_LENGTH} characters")
+        if not is_ldh(label):
+            raise InvalidName("only letters, digits and inner hyphens are allowed")
+        return label
+    if IDN_NAMES == "ascii":
+        raise InvalidName("not in Latin letters")
+    try:
+        encoded = idna.alabel(label).decode("ascii")
+    except idna.IDNAError as e:
+        raise InvalidName(f"not a valid internationalised name ({e})") from e
+    if len(encoded) > MAX_LABEL_LENGTH:
+        raise InvalidName(f"longer than {MAX_LABEL_LENGTH} characters once encoded")
+    return encoded
+
+
+def canonical(name):
+    """``to_label(name)``, or None when the name cannot be registered."""
+    try:
+        return to_label(name)
+    except InvalidName:
+        return None
+
+
+def accept(name, seen):
+    """Label for a new name, or None if it is invalid or its label is already in ``seen`` (a set, updated)."""
+    try:
+        label = to_label(name)
+    except InvalidName:
+        REJECTED.inc(reason="invalid")
+        return None
+    if label in seen:
+        REJECTED.inc(reason="duplicate")
+        return None
+    seen.add(label)
+    return label
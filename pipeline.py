@@ -0,0 +1,339 @@
+import math
+import os
+import queue
+import threading
+import time
+from concurrent.futures import CancelledError, as_completed
+
+import metrics
+from domain_checker import EXTENSIONS, PlanRunner, domain_label, submit_lookup
+from results import DomainResult
+from name_generator import generate_startup_names, stream_startup_names
+from tld_policy import TldPolicy
+
+QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "16"))
+MAX_IN_FLIGHT = int(os.getenv("PIPELINE_MAX_IN_FLIGHT", "32"))
+OVERSAMPLE = float(os.getenv("AVAILABILITY_OVERSAMPLE", "2.0"))
+MAX_ROUNDS = int(os.getenv("AVAILABILITY_MAX_ROUNDS", "3"))
+VARIANTS = int(os.getenv("NAME_VARIANTS", "0"))
+
+_DONE = object()
+
+PIPELINE_SECONDS = metrics.histogram("pipeline_seconds", "Generate-and-check run milestones: first name, first result, total")
+SEARCH_CANDIDATES = metrics.counter("availability_search_candidates_total",
+                                    "Candidates seen by find_available_names: qualified, rejected or cancelled, by source")
+
+
+class _Checker:
+    """Dispatches lookups for names as they arrive and reports results into ``events``.
+
+    Each name's TLDs follow its plan under ``policy``: later waves are sent
+    from the callback of the lookup that completes the previous one.
+    """
+
+    def __init__(self, events, policy, max_in_flight):
+        self.events = events
+        self.policy = policy
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._owners = {}    # label -> names waiting on it
+        self._reported = {}  # label -> results so far, replayed to a later name with the same label
+        self._pending = 1    # the dispatcher itself counts until its input is exhausted
+
+    def check(self, name):
+        label = domain_label(name)
+        with self._lock:
+            if label in self._owners:
+                self._owners[label].append(name)
+                for result in self._reported[label]:
+                    self.events.put(("result", name, result))
+                return
+            self._owners[label] = [name]
+            self._reported[label] = []
+            self._pending += 1
+            plan = self.policy.plan(label)
+            wave = plan.next_wave()
+        self._send(plan, wave, blocking=True)
+
+    def _send(self, plan, wave, blocking):
+        if not wave:
+            self._finish(plan)
+            return
+        for domain, ext in wave:
+            # The dispatcher waits for a slot, which holds back generation; a follow-up
+            # wave is sent from a pool thread, which must never block on one
+            held = self._slots.acquire(blocking=blocking)
+            future = submit_lookup(domain, ext)
+            future.add_done_callback(lambda f, domain=domain, held=held: self._on_done(plan, domain, f, held))
+
+    def _on_done(self, plan, domain, future, held):
+        if held:
+            self._slots.release()
+        try:
+            result = future.result()
+        except Exception as e:
+            result = DomainResult.failed(domain, e)
+        with self._lock:
+            plan.record(result)
+            wave = None if plan.waiting else plan.next_wave()
+        self._report(plan.label, result)
+        if wave is not None:
+            self._send(plan, wave, blocking=False)
+
+    def _finish(self, plan):
+        with self._lock:
+            skipped = plan.skipped()
+        for result in skipped:
+            self._report(plan.label, result)
+        self._release()
+
+    def _report(self, label, result):
+        with self._lock:
+            self._reported[label].append(result)
+            owners = list(self._owners[label])
+        for name in owners:
+            self.events.put(("result", name, result))
+
+    def finish(self):
+        self._release()
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+            done = self._pending == 0
+        if done:
+            self.events.put(_DONE)
+
+
+def run_pipeline(keywords, count=5, tlds=None, queue_size=QUEUE_SIZE, max_in_flight=MAX_IN_FLIGHT, policy=None):
+    """Generate names and check their domains at the same time.
+
+    Names stream from the model into a bounded queue; a dispatcher starts the
+    lookups for each name as soon as it is dequeued. Yields, in arrival order:
+
+        ("name", name)                    a new name from the model
+        ("result", name, DomainResult)    one finished lookup
+        ("suggested", name)               the model's pick, once generation ends
+
+    ``policy`` (a tld_policy.TldPolicy) overrides ``tlds`` and may leave
+    TLDs out; those arrive as skipped results.
+    """
+    policy = policy or TldPolicy(tlds or EXTENSIONS)
+    names = queue.Queue(maxsize=queue_size)
+    events = queue.Queue()
+    stream = stream_startup_names(keywords, count)
+
+    def produce():
+        try:
+            for name in stream:
+                names.put(name)
+            if len(stream.names) < count:
+                # Short or failed stream: top up through the blocking call and its retry budget
+                extra, suggested = generate_startup_names(keywords, count - len(stream.names), exclude=stream.names)
+                stream.suggested = stream.suggested or suggested
+                for name in extra:
+                    names.put(name)
+        finally:
+            names.put(_DONE)
+
+    def dispatch():
+        checker = _Checker(events, policy, max_in_flight)
+        seen = set()
+        try:
+            while True:
+                name = names.get()
+                if name is _DONE:
+                    break
+                label = domain_label(name)
+                if not label or label in seen:
+                    continue
+                seen.add(label)
+                events.put(("name", name))
+                checker.check(name)
+            events.put(("suggested", stream.suggested))
+        finally:
+            checker.finish()
+
+    threading.Thread(target=produce, name="pipeline-generate", daemon=True).start()
+    threading.Thread(target=dispatch, name="pipeline-dispatch", daemon=True).start()
+
+    started = time.perf_counter()
+    milestones = {"name": "first_name", "result": "first_result"}
+    while True:
+        event = events.get()
+        if event is _DONE:
+            PIPELINE_SECONDS.observe(time.perf_counter() - started, stage="total")
+            return
+        stage = milestones.pop(event[0], None)
+        if stage:
+            PIPELINE_SECONDS.observe(time.perf_counter() - started, stage=stage)
+        yield event
+
+
+def _result_of(future, domain):
+    try:
+        return future.result()
+    except CancelledError:
+        return None
+    except Exception as e:
+        return DomainResult.failed(domain, e)
+
+
+def find_available_names(keywords, count=5, required_tlds=(".com",), tlds=None,
+                         oversample=OVERSAMPLE, max_rounds=MAX_ROUNDS, policy=None, variants=VARIANTS):
+    """Generate names until ``count`` of them have every ``required_tlds`` domain available.
+
+    Each round asks the model for ``oversample`` times the names still
+    missing and checks only the required TLDs. A name is dropped at its first
+    taken (or failed) required domain, and its other queued lookups are
+    cancelled; once enough names qualify every outstanding lookup is
+    cancelled. The remaining ``tlds`` are looked up for the winners only,
+    following ``policy`` if one is given. With ``variants`` set, each round
+    also checks that many local variants of the model's names (see
+    variants.py). Yields the same events as ``run_pipeline``, for
+    qualifying names only.
+    """
+    if variants:
+        from variants import top_variants  # NumPy stays out of the app's start-up unless variants are on
+    policy = policy or TldPolicy(tlds or EXTENSIONS)
+    required = list(required_tlds)
+    extra_tlds = [ext for ext in policy.tlds if ext not in required]
+    seen = []
+    found = []
+    suggested = ""
+    extras = PlanRunner()  # the winners' other TLDs
+    winners = {}           # label -> name
+    variant_names = set()
+
+    def source_of(name):
+        return "variant" if name in variant_names else "model"
+
+    for _ in range(max_rounds):
+        wanted = math.ceil((count - len(found)) * oversample)
+        candidates, round_suggested = generate_startup_names(keywords, wanted, exclude=seen)
+        if not candidates:
+            break
+        if variants:
+            extra = top_variants(candidates, keywords, variants, exclude=seen)
+            variant_names.update(extra)
+            candidates = candidates + extra
+        seen.extend(candidates)
+        suggested = suggested or round_suggested
+
+        pending = {}   # future -> (name, domain)
+        by_name = {}   # name -> its required-TLD futures
+        passed = {}    # name -> {domain: DomainResult} so far
+        labels = set()
+        for name in candidates:
+            label = domain_label(name)
+            if not label or label in labels:
+                continue
+            labels.add(label)
+            passed[name] = {}
+            by_name[name] = []
+            for ext in required:
+                domain = f"{label}{ext}"
+                future = submit_lookup(domain, ext)
+                pending[future] = (name, domain)
+                by_name[name].append(future)
+
+        rejected = set()
+        try:
+            for future in as_completed(pending):
+                name, domain = pending[future]
+                result = _result_of(future, domain)
+                if name in rejected or result is None:
+                    continue
+                if not result.available:
+                    rejected.add(name)
+                    SEARCH_CANDIDATES.inc(outcome="rejected", source=source_of(name))
+                    for other in by_name[name]:
+                        other.cancel()
+                    continue
+                passed[name][domain] = result
+                if len(passed[name]) < len(required):
+                    continue
+
+                SEARCH_CANDIDATES.inc(outcome="qualified", source=source_of(name))
+                found.append(name)
+                yield ("name", name)
+                for qualified in passed[name].values():
+                    yield ("result", name, qualified)
+                winners[domain_label(name)] = name
+                plan = policy.plan(domain_label(name), extra_tlds, known=passed[name].values())
+                for skipped in extras.start(plan):
+                    yield ("result", name, skipped)
+                if len(found) >= count:
+                    break
+        finally:
+            for future, (name, _) in pending.items():
+                if future.cancel():
+                    SEARCH_CANDIDATES.inc(outcome="cancelled", source=source_of(name))
+        if len(found) >= count:
+            break
+
+    for plan, result in extras.results():
+        yield ("result", winners[plan.label], result)
+    yield ("suggested", suggested if suggested in found else (found[0] if found else ""))
+
+
+class PipelineJob:
+    """Runs ``run_pipeline`` on a background thread and keeps the partial results.
+
+    With ``required_tlds`` it runs ``find_available_names`` instead, so only
+    names with those domains available are reported, helped by ``variants``
+    local variants per round. ``policy`` (a
+    tld_policy.TldPolicy) overrides ``tlds`` and sets the early-exit rules.
+
+    Safe to poll from another thread (e.g. a Streamlit rerun): ``snapshot()``
+    returns a consistent copy of what has arrived so far.
+    """
+
+    def __init__(self, keywords, count=5, tlds=None, required_tlds=None, policy=None, variants=VARIANTS):
+        self.keywords = keywords
+        self.count = count
+        self.variants = variants
+        self.policy = policy or TldPolicy(tlds or EXTENSIONS)
+        self.tlds = self.policy.tlds
+        self.required_tlds = required_tlds
+        self.names = []
+        self.suggested = ""
+        self.results = {}  # name -> {domain: DomainResult, or None while pending}
+        self.error = None
+        self.done = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="pipeline-job", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        if self.required_tlds:
+            events = find_available_names(self.keywords, self.count, self.required_tlds, policy=self.policy,
+                                          variants=self.variants)
+        else:
+            events = run_pipeline(self.keywords, self.count, policy=self.policy)
+        try:
+            for event in events:
+                with self._lock:
+                    if event[0] == "name":
+                        name = event[1]
+                        self.names.append(name)
+                        # Pre-seeded so rows keep TLD order whatever finishes first
+                        self.results[name] = {f"{domain_label(name)}{ext}": None for ext in self.tlds}
+                    elif event[0] == "result":
+                        _, name, result = event
+                        self.results[name][result.domain] = result
+                    elif event[0] == "suggested":
+                        self.suggested = event[1]
+        except Exception as e:
+            with self._lock:
+                self.error = str(e)
+        finally:
+            with self._lock:
+                self.done = True
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.names), self.suggested, {name: dict(rows) for name, rows in self.results.items()}
@@ -0,0 +1,226 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from dotenv import load_dotenv
+from circuit_breaker import CircuitBreaker
+import dns_lookup
+import http_client
+import metrics
+from rate_limit import Cancelled, backoff_delay, limiter_from_env, retry_after_seconds
+from results import DomainResult, Status
+
+load_dotenv()
+API_NINJAS_KEY = os.getenv("API_NINJAS_KEY")
+WHOSXY_API_KEY = os.getenv("WHOSXY_API_KEY")
+# Overridable so benchmarks and tests can point at local stand-ins (see bench/stub_servers.py)
+API_NINJAS_BASE_URL = os.getenv("API_NINJAS_BASE_URL", "https://api.api-ninjas.com").rstrip("/")
+WHOXY_BASE_URL = os.getenv("WHOXY_BASE_URL", "https://api.whoxy.com").rstrip("/")
+RDAP_BASE_URL = os.getenv("RDAP_BASE_URL", "https://rdap.org").rstrip("/")
+
+# Per-provider budgets shared by every session in the process. Requests over the
+# budget queue here instead of coming back as 429 errors.
+_limiters = {
+    "api_ninjas": limiter_from_env("api_ninjas", "API_NINJAS", rate=10, burst=10, max_in_flight=8),
+    "whoxy": limiter_from_env("whoxy", "WHOXY", rate=5, burst=5, max_in_flight=8),
+    "rdap": limiter_from_env("rdap", "RDAP", rate=10, burst=10, max_in_flight=8),
+}
+RETRYABLE_STATUS = {429, 503}
+MAX_RETRIES = int(os.getenv("LOOKUP_MAX_RETRIES", "3"))
+MAX_RETRY_AFTER = 60.0
+
+DNS_MAX_IN_FLIGHT = int(os.getenv("DNS_MAX_IN_FLIGHT", "8"))
+
+BREAKER_FAILURES = int(os.getenv("PROVIDER_BREAKER_FAILURES", "5"))
+BREAKER_RESET = float(os.getenv("PROVIDER_BREAKER_RESET", "30"))
+
+
+PROVIDER_SECONDS = metrics.histogram("provider_request_seconds", "Time spent in one provider call, retries included")
+PROVIDER_RETRIES = metrics.counter("provider_retries_total", "Provider requests retried after a 429/503")
+PROVIDER_SKIPS = metrics.counter("provider_skipped_total", "Lookups that skipped a provider because its breaker was open")
+
+
+class InconclusiveLookup(Exception):
+    """The provider answered fine but could not decide; try the next one without blaming it."""
+
+
+# The lookup future a pool thread is working for, so waits can stop once it is cancelled
+_current = threading.local()
+
+
+def _cancelled():
+    lookup = getattr(_current, "lookup", None)
+    return lookup is not None and lookup.cancelled()
+
+
+def _limited_get(provider, url, **kwargs):
+    limiter = _limiters[provider]
+    for attempt in range(MAX_RETRIES + 1):
+        with limiter.slot(_cancelled):
+            r = http_client.get(url, **kwargs)
+        if r.status_code not in RETRYABLE_STATUS or attempt == MAX_RETRIES:
+            return r
+        PROVIDER_RETRIES.inc(provider=provider, status=r.status_code)
+        wait = retry_after_seconds(r.headers.get("Retry-After"))
+        if wait is not None:
+            # The next slot() waits out the pause for every caller of this provider
+            limiter.pause(min(wait, MAX_RETRY_AFTER))
+        else:
+            time.sleep(backoff_delay(attempt))
+    return r
+
+
+# Each provider returns Status.AVAILABLE / Status.TAKEN or raises; a raise counts against its breaker.
+
+def check_api_ninjas(domain):
+    url = f"{API_NINJAS_BASE_URL}/v1/domainlookup?domain={domain}"
+    r = _limited_get("api_ninjas", url, headers={"X-Api-Key": API_NINJAS_KEY})
+    if r.status_code == 404:
+        return Status.AVAILABLE
+    r.raise_for_status()
+    data = r.json()
+    return Status.TAKEN if data.get("is_registered") else Status.AVAILABLE
+
+
+def check_whoxy(domain):
+    url = f"{WHOXY_BASE_URL}/?key={WHOSXY_API_KEY}&whois={domain}"
+    r = _limited_get("whoxy", url)
+    r.raise_for_status()
+    data = r.json()
+    if data.get("status") == 1 and "domain" in data:
+        return Status.TAKEN
+    return Status.AVAILABLE
+
+
+def check_rdap(domain):
+    # rdap.org redirects to the registry's own RDAP server, whose 404 means no such registration.
+    # A 404 from rdap.org itself only means it knows no RDAP server for the TLD.
+    r = _limited_get("rdap", f"{RDAP_BASE_URL}/domain/{domain}", headers={"Accept": "application/rdap+json"})
+    if r.status_code == 404:
+        if not r.history:
+            raise InconclusiveLookup("no RDAP server for this TLD")
+        return Status.AVAILABLE
+    r.raise_for_status()
+    return Status.TAKEN
+
+
+def check_dns(domain):
+    # Last resort: DNS can prove a domain is taken, but never that it is free
+    if dns_lookup.resolves(domain):
+        return Status.TAKEN
+    raise InconclusiveLookup("not in DNS, availability unconfirmed")
+
+
+PROVIDERS = {
+    "api_ninjas": check_api_ninjas,
+    "whoxy": check_whoxy,
+    "rdap": check_rdap,
+    "dns": check_dns,
+}
+
+# Providers to try per TLD, in order; "*" covers every TLD without its own entry
+PROVIDER_CHAINS = {
+    ".com": ["api_ninjas", "rdap", "dns"],
+    "*": ["whoxy", "rdap", "dns"],
+}
+
+_breakers = {name: CircuitBreaker(name, BREAKER_FAILURES, BREAKER_RESET) for name in PROVIDERS}
+
+# Every provider gets its own workers, as many as it may have in flight, so one
+# waiting on its rate limit or a Retry-After only ever holds up its own lookups
+_pools = {
+    name: ThreadPoolExecutor(max_workers=limiter.max_in_flight, thread_name_prefix=f"lookup-{name}")
+    for name, limiter in _limiters.items()
+}
+_pools["dns"] = ThreadPoolExecutor(max_workers=DNS_MAX_IN_FLIGHT, thread_name_prefix="lookup-dns")
+
+
+def _call(name, domain, lookup):
+    # (status, None) on an answer, (None, error text) to move on down the chain,
+    # (None, None) if the lookup was cancelled before the request went out
+    breaker = _breakers[name]
+    if lookup.cancelled():
+        breaker.release()
+        return None, None
+    _current.lookup = lookup
+    with metrics.timed(PROVIDER_SECONDS, provider=name) as labels:
+        try:
+            status = PROVIDERS[name](domain)
+        except Cancelled:
+            labels["outcome"] = "cancelled"
+            breaker.release()
+            return None, None
+        except InconclusiveLookup as e:
+            labels["outcome"] = "inconclusive"
+            breaker.record_success()
+            return None, f"{name}: {e}"
+        except Exception as e:
+            labels["outcome"] = "error"
+            breaker.record_failure(e)
+            return None, f"{name}: {e}"
+        finally:
+            _current.lookup = None
+        labels["outcome"] = "ok"
+    breaker.record_success()
+    return status, None
+
+
+def submit(domain, ext):
+    """Check one domain against its provider chain; returns a Future of its DomainResult.
+
+    Each provider call runs on that provider's pool and the next provider is
+    queued from its callback, so no thread ever waits on another provider.
+    Providers whose breaker is open are skipped. Cancelling the Future stops
+    the chain: calls still queued are dropped without reaching the provider.
+    """
+    outcome = Future()
+    chain = PROVIDER_CHAINS.get(ext, PROVIDER_CHAINS["*"])
+    errors = []
+    current = []  # the provider call in progress, cancelled along with the lookup
+    started = time.perf_counter()
+
+    def settle(result):
+        try:
+            outcome.set_result(result)
+        except InvalidStateError:
+            pass  # cancelled meanwhile
+
+    def attempt(position):
+        for position in range(position, len(chain)):
+            if outcome.cancelled():
+                return
+            name = chain[position]
+            if not _breakers[name].allow():
+                PROVIDER_SKIPS.inc(provider=name)
+                errors.append(f"{name} unavailable")
+                continue
+            try:
+                call = _pools[name].submit(_call, name, domain, outcome)
+            except RuntimeError as e:  # the pool is shutting down with the interpreter
+                _breakers[name].release()
+                errors.append(f"{name}: {e}")
+                continue
+            current[:] = [call]
+            call.add_done_callback(lambda f, position=position: answered(f, position))
+            return
+        settle(DomainResult.failed(domain, "; ".join(errors), latency=time.perf_counter() - started))
+
+    def answered(call, position):
+        if call.cancelled():
+            _breakers[chain[position]].release()
+            return
+        status, error = call.result()
+        if status is not None:
+            settle(DomainResult(domain, status, chain[position], time.perf_counter() - started))
+        elif error is not None:
+            errors.append(error)
+            attempt(position + 1)
+
+    outcome.add_done_callback(lambda f: f.cancelled() and current and current[0].cancel())
+    attempt(0)
+    return outcome
+
+
+def lookup(domain, ext):
+    """Blocking form of ``submit()``."""
+    return submit(domain, ext).result()
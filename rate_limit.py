@@ -0,0 +1,98 @@
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+
+class Cancelled(Exception):
+    """The caller gave up while waiting for its turn."""
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second, up to ``burst`` saved up."""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        # Take a token if one is free, otherwise return how long to wait for the next one
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, cancelled=None):
+        # ``cancelled()`` is checked before every try, so a caller that gives up never takes a token
+        while True:
+            if cancelled is not None and cancelled():
+                raise Cancelled()
+            wait = self._reserve()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        # Upstream asked us to back off (Retry-After): hold every caller, not just this one
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class ProviderLimiter:
+    """Process-wide budget for one lookup provider: request rate plus a cap on in-flight calls."""
+
+    def __init__(self, name, rate, burst, max_in_flight):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.max_in_flight = max_in_flight
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+
+    @contextmanager
+    def slot(self, cancelled=None):
+        with self._in_flight:
+            self.bucket.acquire(cancelled)
+            yield
+
+    def pause(self, seconds):
+        self.bucket.pause(seconds)
+
+
+def limiter_from_env(name, prefix, rate, burst, max_in_flight):
+    return ProviderLimiter(
+        name,
+        rate=float(os.getenv(f"{prefix}_RATE", str(rate))),
+        burst=float(os.getenv(f"{prefix}_BURST", str(burst))),
+        max_in_flight=int(os.getenv(f"{prefix}_MAX_IN_FLIGHT", str(max_in_flight))),
+    )
+
+
+def backoff_delay(attempt, base=0.5, cap=30.0):
+    # "Full jitter": spread retries over [0, base * 2^attempt] so callers don't retry in lockstep
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def retry_after_seconds(value):
+    """Parse a Retry-After header (delta-seconds or HTTP date); None if missing or unparsable."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
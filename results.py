@@ -0,0 +1,99 @@
+import json
+import time
+from enum import Enum
+
+
+class Status(Enum):
+    AVAILABLE = "available"
+    TAKEN = "taken"
+    ERROR = "error"
+    SKIPPED = "skipped"  # left out by the TLD policy's early exit, never looked up
+    INVALID = "invalid"  # the name can never be registered (see normalise.py), never looked up
+
+
+LABELS = {
+    Status.AVAILABLE: "✅ Available",
+    Status.TAKEN: "❌ Taken",
+    Status.ERROR: "⚠️ Error",
+    Status.SKIPPED: "⏭️ Skipped",
+    Status.INVALID: "🚫 Invalid name",
+}
+
+
+class DomainResult:
+    """Outcome of one domain lookup.
+
+    ``provider`` is who answered (api_ninjas, whoxy, rdap, dns, index, ...)
+    and ``source`` how we got it this time ("live", "cache", "index",
+    "policy" for a TLD the early exit left out, or "local" for a name
+    rejected as unregistrable).
+    ``latency`` is the seconds the live lookup took; ``checked_at`` is a
+    Unix timestamp.
+    Slotted, so a large batch costs a few dozen bytes per result.
+    """
+
+    __slots__ = ("domain", "status", "provider", "latency", "checked_at", "source", "error")
+
+    def __init__(self, domain, status, provider="", latency=0.0, checked_at=None, source="live", error=""):
+        self.domain = domain
+        self.status = status
+        self.provider = provider
+        self.latency = latency
+        self.checked_at = time.time() if checked_at is None else checked_at
+        self.source = source
+        self.error = error
+
+    @classmethod
+    def failed(cls, domain, error, provider="", latency=0.0):
+        return cls(domain, Status.ERROR, provider, latency, error=str(error))
+
+    @classmethod
+    def skipped(cls, domain, reason):
+        # The reason rides in ``error`` so rows and exports show why
+        return cls(domain, Status.SKIPPED, "policy", source="policy", error=reason)
+
+    @classmethod
+    def invalid(cls, domain, reason):
+        return cls(domain, Status.INVALID, "normalise", source="local", error=reason)
+
+    @property
+    def tld(self):
+        return "." + self.domain.rsplit(".", 1)[-1]
+
+    @property
+    def available(self):
+        return self.status is Status.AVAILABLE
+
+    @property
+    def label(self):
+        # The wording the UI has always shown, e.g. "❌ Taken" or "⚠️ Error (.ai): timeout"
+        if self.status is Status.ERROR:
+            return f"{LABELS[Status.ERROR]} ({self.tld}): {self.error}"
+        if self.status in (Status.SKIPPED, Status.INVALID):
+            return f"{LABELS[self.status]} ({self.error})"
+        return LABELS[self.status]
+
+    def __str__(self):
+        return self.label
+
+    def __repr__(self):
+        return f"DomainResult({self.domain!r}, {self.status.name}, provider={self.provider!r}, source={self.source!r})"
+
+    def to_row(self):
+        return {
+            "domain": self.domain,
+            "status": self.status.value,
+            "provider": self.provider,
+            "latency_ms": round(self.latency * 1000, 1),
+            "checked_at": round(self.checked_at, 3),
+            "source": self.source,
+            "error": self.error,
+        }
+
+    def to_json(self):
+        return json.dumps([self.status.value, self.provider, round(self.latency, 4), round(self.checked_at, 3), self.error])
+
+    @classmethod
+    def from_json(cls, domain, raw, source="cache"):
+        status, provider, latency, checked_at, error = json.loads(raw)
+        return cls(domain, Status(status), provider, latency, checked_at, source, error)
@@ -0,0 +1,125 @@
+"""Coalesce identical in-flight calls into one.
+
+The first caller for a key starts the work; anyone asking for the same key
+while it is still running waits on that same result (or error) instead of
+starting a duplicate upstream request. Nothing is remembered once the call
+finishes - that is the caches' job.
+
+    flights = SingleFlight("domain", timeout=60)
+    future = flights.submit("glowly.com", executor, lookup, "glowly.com", ".com")
+    names = flights.do(("beauty", 5), generate, "beauty", 5)
+
+A flight older than ``timeout`` seconds is no longer joined: the next caller
+starts a fresh one, so one hung request cannot hold a key forever.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+
+import metrics
+
+CALLS = metrics.counter("singleflight_calls_total", "Coalesced calls by group and role: leader, follower or expired")
+
+
+class _Flight:
+    __slots__ = ("future", "started", "waiters")
+
+    def __init__(self, future):
+        self.future = future
+        self.started = time.monotonic()
+        self.waiters = 0
+
+
+def _copy_outcome(source, target):
+    try:
+        if source.cancelled():
+            target.cancel()
+        elif source.exception() is not None:
+            target.set_exception(source.exception())
+        else:
+            target.set_result(source.result())
+    except InvalidStateError:
+        pass  # the caller cancelled its own future in the meantime
+
+
+class SingleFlight:
+    def __init__(self, name, timeout=None):
+        self.name = name
+        self.timeout = timeout
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key, start):
+        # (flight, leader?) - a new flight's future comes from start(), called under the lock
+        # so a follower arriving right behind the leader always sees the real future
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None and self.timeout is not None and time.monotonic() - flight.started > self.timeout:
+                CALLS.inc(group=self.name, role="expired")
+                flight = None
+            if flight is not None:
+                CALLS.inc(group=self.name, role="follower")
+                flight.waiters += 1
+                return flight, False
+            flight = self._flights[key] = _Flight(start())
+            flight.waiters = 1
+            CALLS.inc(group=self.name, role="leader")
+            return flight, True
+
+    def _release(self, key, flight):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def do(self, key, fn, *args, **kwargs):
+        """Run ``fn`` in this thread, or wait for the identical call already running.
+
+        Errors raised by ``fn`` reach every caller. A follower waits at most
+        until the flight is ``timeout`` seconds old and then gets ``concurrent.futures.TimeoutError``.
+        """
+        flight, leader = self._join(key, Future)
+        if not leader:
+            wait = None if self.timeout is None else max(0.0, self.timeout - (time.monotonic() - flight.started))
+            return flight.future.result(timeout=wait)
+
+        flight.future.set_running_or_notify_cancel()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            flight.future.set_exception(e)
+            raise
+        else:
+            flight.future.set_result(result)
+            return result
+        finally:
+            self._release(key, flight)
+
+    def submit(self, key, executor, fn, *args, **kwargs):
+        """Queue ``fn`` on ``executor`` unless the same key is already queued or running.
+
+        Every caller gets its own Future, so cancelling one only detaches that
+        caller; the shared work is cancelled once nobody is waiting for it and
+        it has not started yet.
+        """
+        return self.attach(key, lambda: executor.submit(fn, *args, **kwargs))
+
+    def attach(self, key, start):
+        """Like ``submit()``, for work that ``start()`` kicks off itself, returning its Future."""
+        flight, leader = self._join(key, start)
+        mine = Future()
+        if leader:
+            flight.future.add_done_callback(lambda _: self._release(key, flight))
+
+        def detach(future):
+            if not future.cancelled():
+                return
+            with self._lock:
+                flight.waiters -= 1
+                abandoned = flight.waiters == 0
+            if abandoned:
+                flight.future.cancel()
+
+        mine.add_done_callback(detach)
+        flight.future.add_done_callback(lambda shared: _copy_outcome(shared, mine))
+        return mine
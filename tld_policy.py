@@ -0,0 +1,165 @@
+"""Which TLDs to check for a name, in what order, and when to stop.
+
+A ``TldPolicy`` is an ordered list of TLDs (most wanted first) plus optional
+early-exit rules:
+
+    TldPolicy(TLD_SETS["popular"])                            # check them all
+    TldPolicy(TLD_SETS["global"], stop_after=3)               # stop once 3 are available
+    TldPolicy([".com", ".in", ".ai"], skip_cctlds_if_com=True)
+
+With a rule set, lookups go out in waves in priority order and the next
+wave is only sent if the rules still call for it; TLDs never looked up are
+reported as skipped. Without rules every TLD is looked up at once, as before.
+None of the lookup providers takes several domains per request, so the
+saving comes from the lookups that are never made.
+"""
+
+import math
+import os
+import re
+
+from normalise import is_ldh
+from results import DomainResult
+
+TLD_SETS = {
+    "default": [".com", ".in", ".ai", ".co"],
+    "popular": [".com", ".net", ".org", ".io", ".ai", ".co", ".app", ".dev", ".xyz", ".tech"],
+    "global": [
+        ".com", ".net", ".org", ".io", ".ai", ".co", ".app", ".dev", ".xyz", ".tech",
+        ".info", ".biz", ".me", ".tv", ".cc", ".online", ".site", ".store", ".shop", ".cloud",
+        ".design", ".studio", ".agency", ".digital", ".world", ".life", ".space", ".live",
+        ".us", ".uk", ".ca", ".de", ".fr", ".nl", ".eu", ".in",
+    ],
+}
+
+# Extra lookups sent per still-missing available TLD in each wave; above 1
+# trades a few lookups for fewer round trips
+WAVE_OVERSAMPLE = float(os.getenv("TLD_WAVE_OVERSAMPLE", "1.5"))
+
+
+def is_valid_tld(tld):
+    # ".com", ".co.uk", ".xn--p1ai": dot-separated LDH labels, the last one not all digits
+    labels = tld[1:].split(".") if tld.startswith(".") else [""]
+    return all(is_ldh(label) for label in labels) and not labels[-1].isdigit()
+
+
+def parse_tlds(value, rejected=None):
+    """".com ai,popular" -> [".com", ".ai", ".net", ...]; set names from TLD_SETS expand in place.
+
+    Items are separated by commas and/or whitespace. Anything that is not a
+    valid TLD is left out, and appended to ``rejected`` if a list is given.
+    """
+    tlds = []
+    for item in re.split(r"[\s,]+", value.lower()):
+        if not item:
+            continue
+        for tld in TLD_SETS.get(item, ["." + item.lstrip(".")]):
+            if not is_valid_tld(tld):
+                if rejected is not None:
+                    rejected.append(item)
+            elif tld not in tlds:
+                tlds.append(tld)
+    return tlds
+
+
+def is_cctld(tld):
+    # Country codes are the two-letter TLDs (.in, .ai, .co, .io, ...)
+    return len(tld.lstrip(".")) == 2
+
+
+class TldPolicy:
+    def __init__(self, tlds, stop_after=None, skip_cctlds_if_com=False, oversample=WAVE_OVERSAMPLE):
+        self.tlds = list(dict.fromkeys(tlds))
+        self.stop_after = stop_after or None
+        self.skip_cctlds_if_com = skip_cctlds_if_com
+        self.oversample = oversample
+
+    @property
+    def early_exit(self):
+        return bool(self.stop_after or self.skip_cctlds_if_com)
+
+    def plan(self, label, tlds=None, known=()):
+        return TldPlan(self, label, self.tlds if tlds is None else tlds, known)
+
+    def __repr__(self):
+        return f"TldPolicy({self.tlds!r}, stop_after={self.stop_after!r}, skip_cctlds_if_com={self.skip_cctlds_if_com!r})"
+
+
+class TldPlan:
+    """Lookup waves for one domain label under a policy.
+
+    Call ``next_wave()`` for the (domain, tld) pairs to look up, ``record()``
+    each result, and ``next_wave()`` again once ``waiting`` is False. An empty
+    wave means the plan is finished; ``skipped()`` then returns a SKIPPED
+    result for every TLD left out. Results in ``known`` (e.g. from an earlier
+    required-TLD check) count towards the rules without being looked up again.
+    """
+
+    def __init__(self, policy, label, tlds, known=()):
+        self.policy = policy
+        self.label = label
+        self.results = {result.domain: result for result in known}
+        self._remaining = [tld for tld in tlds if self.domain(tld) not in self.results]
+        self._has_com = ".com" in tlds or self.domain(".com") in self.results
+        self._in_flight = 0
+        self._reasons = {}
+
+    def domain(self, tld):
+        return f"{self.label}{tld}"
+
+    @property
+    def waiting(self):
+        return self._in_flight > 0
+
+    def _available(self):
+        return sum(result.available for result in self.results.values())
+
+    def next_wave(self):
+        policy = self.policy
+        if not policy.early_exit:
+            wave, self._remaining = self._remaining, []
+        else:
+            wave = self._early_exit_wave()
+        self._in_flight += len(wave)
+        return [(self.domain(tld), tld) for tld in wave]
+
+    def _early_exit_wave(self):
+        policy = self.policy
+        available = self._available()
+        if policy.stop_after and available >= policy.stop_after:
+            for tld in self._remaining:
+                self._reasons.setdefault(tld, f"{policy.stop_after} available already")
+            return []
+
+        candidates = self._remaining
+        if policy.skip_cctlds_if_com and self._has_com:
+            com = self.results.get(self.domain(".com"))
+            if com is not None and com.available:
+                for tld in candidates:
+                    if is_cctld(tld):
+                        self._reasons[tld] = ".com available"
+                candidates = [tld for tld in candidates if not is_cctld(tld)]
+            elif com is None:
+                # Hold the ccTLDs back until .com has answered
+                candidates = [tld for tld in candidates if not is_cctld(tld)]
+
+        if policy.stop_after:
+            size = max(1, math.ceil((policy.stop_after - available) * policy.oversample))
+            head = candidates[:size]
+            if policy.skip_cctlds_if_com and ".com" in candidates and ".com" not in head:
+                head = [".com"] + head[:-1]
+            candidates = head
+
+        self._remaining = [tld for tld in self._remaining if tld not in candidates]
+        return candidates
+
+    def record(self, result):
+        self._in_flight -= 1
+        self.results[result.domain] = result
+
+    def skipped(self):
+        skipped = [DomainResult.skipped(self.domain(tld), self._reasons.get(tld, "not needed")) for tld in self._remaining]
+        self._remaining = []
+        for result in skipped:
+            self.results[result.domain] = result
+        return skipped
@@ -0,0 +1,193 @@
+"""Local name variants: turn a handful of AI names into thousands of candidates, keep the best.
+
+    top_variants(["Glowly", "Lumina"], "beauty, AI", k=20)
+    -> ["Glowify", "Lumora", "Getglow", ...]
+
+Each root (the AI names, the keywords, and their stems) is expanded with
+prefixes and suffixes, vowel drops, letter swaps and blends of two roots.
+Every candidate is then scored in one pass over a NumPy byte matrix: how
+English-like its letter pairs are (a bigram model trained on a small word
+list plus the roots), its length, vowel balance and consonant clusters.
+Only the top ``k`` go on to the domain checks, so a round costs a few
+milliseconds of CPU instead of another model call.
+"""
+
+import math
+import re
+from itertools import permutations
+
+import numpy as np
+
+PREFIXES = ["get", "try", "go", "my", "hey", "use", "join", "the"]
+SUFFIXES = ["ly", "ify", "io", "hub", "labs", "able", "ora", "era", "o", "a", "ix", "sy", "iq", "ist", "va", "za", "ster"]
+STEM_SUFFIXES = ["ify", "ly", "io", "er", "ing", "ness", "able"]
+SWAPS = [("ph", "f"), ("ck", "k"), ("c", "k"), ("qu", "kw")]
+VOWELS = b"aeiouy"
+
+MIN_LENGTH, MAX_LENGTH = 4, 14
+IDEAL_LENGTH = 7
+IDEAL_VOWEL_RATIO = 0.42
+
+# Small prior for how brandable each kind of variant tends to be
+PRIORS = {"suffix": 0.1, "prefix": -0.1, "blend": 0.0, "drop": -0.2, "swap": -0.3, "join": -0.1}
+
+_CORPUS = """
+able about after again air all also amber any apple area around away back bake balance base beauty bella berry best
+better bird black blend bloom blue bold bolt book born bright bring brio build butter call calm camp candle care carry
+case center chance change charm city clear clever cloud coast color come comfort cora core craft create crest crown
+daily dance dash data day deep delta design dream drive early earth easy echo edge element ever every fair family far
+farm fast feather field final fire first flame flow flower fly folk forest form fresh friend future garden gentle glow
+gold good grace grand green grow happy harbor harmony haven health heart hello help high hive home honey hope idea
+ideal image inner iris island joy jungle just keen kind king kite lab land late leaf learn level life light lime line
+little live local logic lotus love lucky luna magic make maple market master meadow mind mint mobile moon more motion
+move nature navy nest next nice noble nova ocean olive omni open orbit origin pace palm paper path peak pearl pilot
+pixel place planet play plus point power prime pure quest quick quiet radiant rain rapid ready real river road rock
+rose royal safe sage sail salt scale scout sea seed shine shore signal silver simple sky smart smile snap solar solid
+sound space spark spring star step stone story stream strong studio summer sun swift table tech terra thrive tide tiny
+today token touch tower trail tree true trust unity urban value vast velvet venture verde via vision vista vital
+water wave way wild wind wise wonder wood world yoga young zen zest
+"""
+
+_PAD = 27  # byte-matrix filler after the end of a name; 0 marks the word boundary
+
+
+def _letters(text):
+    return re.sub("[^a-z]", "", text.lower())
+
+
+def _bigram_table(words):
+    # Add-one smoothed log P(next letter | letter) over a..z plus the word boundary
+    counts = np.ones((28, 28))
+    counts[_PAD, :] = counts[:, _PAD] = 0
+    for word in words:
+        codes = [0] + [ord(ch) - 96 for ch in word] + [0]
+        np.add.at(counts, (codes[:-1], codes[1:]), 1)
+    totals = counts.sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore"):
+        table = np.log(counts / np.where(totals == 0, 1, totals))
+    table[_PAD, :] = table[:, _PAD] = 0.0
+    return table
+
+
+_BASE_WORDS = _CORPUS.split()
+
+
+def _stems(root):
+    stems = []
+    for suffix in STEM_SUFFIXES:
+        if root.endswith(suffix) and len(root) - len(suffix) >= 3:
+            stems.append(root[:-len(suffix)])
+    return stems
+
+
+def roots_for(seeds, keywords=""):
+    roots = []
+    for word in [*map(_letters, seeds), *(_letters(w) for w in re.split(r"[\s,;/]+", keywords))]:
+        for root in [word, *_stems(word)]:
+            if len(root) >= 3 and root not in roots:
+                roots.append(root)
+    return roots
+
+
+def expand(roots, max_blend_roots=12):
+    """Every variant of ``roots`` as {candidate: (kind, root)}; the first way a candidate is made wins."""
+    found = {}
+
+    def add(candidate, kind, root):
+        if MIN_LENGTH <= len(candidate) <= MAX_LENGTH and candidate not in found:
+            found[candidate] = (kind, root)
+
+    for root in roots:
+        for suffix in SUFFIXES:
+            add(root + suffix, "suffix", root)
+            if root[-1] in "aeiouy" and suffix[0] in "aeiouy":
+                add(root[:-1] + suffix, "suffix", root)
+        for prefix in PREFIXES:
+            add(prefix + root, "prefix", root)
+        inner = [i for i in range(1, len(root) - 1) if root[i] in "aeiou"]
+        for i in inner:
+            add(root[:i] + root[i + 1:], "drop", root)
+        if len(inner) > 1:
+            add(root[0] + "".join(ch for ch in root[1:-1] if ch not in "aeiou") + root[-1], "drop", root)
+        for old, new in SWAPS:
+            if old in root:
+                add(root.replace(old, new), "swap", root)
+        if root[-1] == "i":
+            add(root[:-1] + "y", "swap", root)
+
+    for a, b in permutations(roots[:max_blend_roots], 2):
+        add(a + b, "join", a)
+        # Keep at least three letters of each side so both roots stay recognisable
+        for i in range(3, len(a)):
+            for j in range(1, len(b) - 2):
+                add(a[:i] + b[j:], "blend", a)
+    return found
+
+
+def score(candidates, table):
+    """Brandability of each candidate (lowercase a-z strings), higher is better, as one NumPy array."""
+    n = len(candidates)
+    width = MAX_LENGTH
+    raw = np.array(candidates, dtype=f"S{width}").view(np.uint8).reshape(n, width)
+    valid = raw != 0
+    lengths = valid.sum(axis=1)
+
+    # Letters as 1..26, framed by the boundary code 0, padded with _PAD
+    codes = np.full((n, width + 2), _PAD, dtype=np.int64)
+    codes[:, 0] = 0
+    codes[:, 1:-1] = np.where(valid, raw.astype(np.int64) - 96, _PAD)
+    codes[np.arange(n), lengths + 1] = 0
+    pairs = (codes[:, :-1] != _PAD) & (codes[:, 1:] != _PAD)
+    bigram = (table[codes[:, :-1], codes[:, 1:]] * pairs).sum(axis=1) / pairs.sum(axis=1)
+
+    vowels = np.isin(raw, np.frombuffer(VOWELS, dtype=np.uint8)) & valid
+    vowel_ratio = vowels.sum(axis=1) / lengths
+    consonants = valid & ~vowels
+    run = np.zeros(n, dtype=np.int64)
+    longest = np.zeros(n, dtype=np.int64)
+    for column in range(width):
+        run = (run + 1) * consonants[:, column]
+        longest = np.maximum(longest, run)
+    triples = ((raw[:, :-2] == raw[:, 1:-1]) & (raw[:, 1:-1] == raw[:, 2:]) & valid[:, 2:]).any(axis=1)
+
+    return (bigram
+            - 0.15 * np.abs(lengths - IDEAL_LENGTH)
+            - 3.0 * np.abs(vowel_ratio - IDEAL_VOWEL_RATIO)
+            - 0.8 * np.maximum(longest - 2, 0)
+            - 2.0 * triples)
+
+
+def top_variants(seeds, keywords="", k=20, exclude=()):
+    """The ``k`` best-scoring variants of ``seeds`` and ``keywords``, capitalised like names.
+
+    Seeds themselves and anything in ``exclude`` are left out, and no root
+    contributes more than its share of the list, so one seed cannot crowd out the rest.
+    """
+    roots = roots_for(seeds, keywords)
+    if not roots or k <= 0:
+        return []
+    skip = set(roots) | {_letters(name) for name in [*seeds, *exclude]}
+    found = {candidate: origin for candidate, origin in expand(roots).items() if candidate not in skip}
+    if not found:
+        return []
+
+    candidates = list(found)
+    table = _bigram_table(_BASE_WORDS + roots)
+    scores = score(candidates, table) + np.array([PRIORS[found[c][0]] for c in candidates])
+
+    # Sorting only the best few times k keeps this cheap even for many thousands of candidates
+    shortlist = min(len(candidates), k * 8)
+    best = np.argpartition(-scores, shortlist - 1)[:shortlist]
+    best = best[np.argsort(-scores[best])]
+
+    per_root = max(2, math.ceil(2 * k / len(roots)))
+    taken, picked = {}, []
+    for index in best:
+        candidate = candidates[index]
+        root = found[candidate][1]
+        if taken.get(root, 0) < per_root:
+            taken[root] = taken.get(root, 0) + 1
+            picked.append(candidate.capitalize())
+            if len(picked) >= k:
+                break
+    return picked